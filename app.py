@@ -1,25 +1,42 @@
-import csv
-import io
-import json
 import os
 import re
-import socket
-import sqlite3
+import time
 import uuid
 
 import streamlit as st
 
-from bulk_import import BULK_REQUIRED_COLUMNS_TEXT, parse_xlsx_without_dependencies, sample_csv_template
+from bulk_import import (
+    BULK_REQUIRED_COLUMNS_TEXT,
+    chunked,
+    iter_csv_records,
+    iter_excel_rows,
+    iter_json_records,
+    iter_xlsx_records,
+    read_excel_header,
+    sample_csv_template,
+)
 from database import (
-    find_existing_project_id,
+    apply_expiry_to_all,
+    count_expired_projects,
     get_all_projects,
+    get_connection,
+    get_latest_change_id,
+    get_projects_grid_page,
+    get_recent_jobs,
+    get_video_reference_counts,
     init_db,
-    insert_project,
-    set_project_expiry,
-    update_project,
+    request_job_cancel,
+    set_qr_paths,
+    sweep_expired,
+    upsert_project,
+    upsert_projects,
 )
+from job_queue import ensure_worker, register_handler, submit_job
 from settings_store import load_settings, save_settings
-from utils.qr_generator import generate_qr
+from utils.qr_batch import qr_job_hash, render_qr_batch, render_qr_job
+from utils.qr_payload import build_qr_payload, compute_qr_base_url, qr_render_options
+from utils.qr_thumbnail import qr_thumbnail, remove_qr_thumbnails
+from video_store import UploadTooLarge, store_video, sweep_orphan_videos, write_stream_atomic
 
 
 REQUIRED_IMPORT_FIELDS = ["name", "roll", "project_title", "project_description"]
@@ -32,17 +49,17 @@ FIELD_LABELS = {
 }
 VIDEO_UPLOAD_DIR = "uploaded_videos"
 ALLOWED_VIDEO_EXTS = {".mp4", ".webm", ".ogg", ".m4v", ".mov"}
-
-
-def detect_lan_ip():
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        sock.connect(("8.8.8.8", 80))
-        return sock.getsockname()[0]
-    except OSError:
-        return "127.0.0.1"
-    finally:
-        sock.close()
+IMPORT_CHUNK_SIZE = 500
+QR_JOB_CHUNK_SIZE = 500
+JOB_UPLOAD_DIR = "job_uploads"
+JOB_PANEL_REFRESH_SECONDS = 2
+JOB_LABELS = {
+    "regenerate_qrs": "Regenerate QRs",
+    "replace_qrs": "Replace existing QRs",
+    "apply_expiry": "Apply expiry rules",
+    "import_projects": "Import projects",
+    "sweep_expired": "Sweep expired projects",
+}
 
 
 def clean_text(value):
@@ -60,34 +77,6 @@ def safe_filename(text):
     return cleaned.strip("_") or "project"
 
 
-def build_qr_payload(
-    qr_base_url,
-    project_id,
-    name,
-    roll,
-    project_title,
-    project_description,
-    video_link,
-    settings,
-):
-    url = f"{qr_base_url}/?id={project_id}"
-    mode = settings.get("qr_payload_mode", "url_only")
-    if mode != "url_with_text":
-        return url
-
-    lines = [
-        url,
-        f"Project: {project_title}",
-        f"Name: {name}",
-        f"Roll: {roll}",
-    ]
-    if project_description:
-        lines.append(f"Description: {project_description}")
-    if video_link:
-        lines.append(f"Video: {video_link}")
-    return "\n".join(lines)
-
-
 def is_valid_image_path(path_value):
     path = clean_text(path_value)
     if not path or path.lower() == "path":
@@ -95,47 +84,49 @@ def is_valid_image_path(path_value):
     return os.path.exists(path)
 
 
-def set_qr_path(project_id, qr_path):
-    conn = sqlite3.connect("expo.db")
+def show_qr_image(qr_path, width):
+    if clean_text(qr_path).lower().endswith(".svg"):
+        with open(qr_path, "r", encoding="utf-8") as file_obj:
+            st.image(file_obj.read(), width=width)
+    else:
+        st.image(qr_path, width=width)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_projects_grid_page(change_id, page, page_size):
+    """One page of the View All Projects grid with thumbnail paths.
+
+    *change_id* (the latest ``project_changes`` id) only keys the cache, so
+    any project write loads the page afresh.
+    """
+    rows, total = get_projects_grid_page(page, page_size)
+    return [(row, qr_thumbnail(clean_text(row[7]))) for row in rows], total
+
+
+def set_qr_path(project_id, qr_path, render_hash=None):
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("UPDATE projects SET qr_path = ? WHERE id = ?", (qr_path, project_id))
+    cursor.execute(
+        "UPDATE projects SET qr_path = ?, qr_render_hash = ? WHERE id = ?",
+        (qr_path, render_hash, project_id),
+    )
     conn.commit()
-    conn.close()
 
 
-def save_uploaded_video(uploaded_file, qr_base_url):
+def save_uploaded_video(uploaded_file, qr_base_url, max_bytes=None):
     if uploaded_file is None:
         return ""
-
     original_name = clean_text(uploaded_file.name)
     ext = os.path.splitext(original_name)[1].lower()
     if ext not in ALLOWED_VIDEO_EXTS:
         return ""
-
-    os.makedirs(VIDEO_UPLOAD_DIR, exist_ok=True)
-    safe_base = safe_filename(os.path.splitext(original_name)[0])
-    file_name = f"{safe_base}_{uuid.uuid4().hex[:10]}{ext}"
-    file_path = os.path.join(VIDEO_UPLOAD_DIR, file_name)
-
-    with open(file_path, "wb") as file_obj:
-        file_obj.write(uploaded_file.getbuffer())
-
+    declared_size = getattr(uploaded_file, "size", None)
+    if max_bytes is not None and declared_size is not None and declared_size > max_bytes:
+        raise UploadTooLarge(f"Video is larger than the {max_bytes // (1024 * 1024)} MB upload limit.")
+    file_name, _ = store_video(uploaded_file, VIDEO_UPLOAD_DIR, ext, max_bytes=max_bytes)
     return f"{qr_base_url}/uploaded_videos/{file_name}"
 
 
-def compute_qr_base_url(settings):
-    flask_port = int(settings.get("flask_port", 5000))
-    public_url = clean_text(settings.get("public_base_url", "")).rstrip("/")
-    manual_url = clean_text(settings.get("manual_qr_base_url", "")).rstrip("/")
-    if public_url:
-        return public_url
-    if settings.get("auto_detect_ip", True):
-        return f"http://{detect_lan_ip()}:{flask_port}"
-    if manual_url:
-        return manual_url
-    return f"http://{detect_lan_ip()}:{flask_port}"
-
-
 def create_project_and_qr(
     name,
     roll,
@@ -145,35 +136,16 @@ def create_project_and_qr(
     qr_base_url,
     settings,
 ):
-    existing_id = find_existing_project_id(roll, project_title)
-    if existing_id:
-        project_id = existing_id
-        update_project(
-            project_id,
-            name,
-            roll,
-            project_title,
-            project_description,
-            video_link,
-            video_link,
-        )
-        set_project_expiry(
-            project_id,
-            expiry_enabled=settings.get("expiry_enabled", True),
-            expiry_days=settings.get("expiry_days", 150),
-        )
-    else:
-        project_id = insert_project(
-            name,
-            roll,
-            project_title,
-            project_description,
-            video_link,
-            video_link,
-            "",
-            expiry_enabled=settings.get("expiry_enabled", True),
-            expiry_days=settings.get("expiry_days", 150),
-        )
+    project_id, previous_qr_path = upsert_project(
+        name,
+        roll,
+        project_title,
+        project_description,
+        video_link,
+        video_link,
+        expiry_enabled=settings.get("expiry_enabled", True),
+        expiry_days=settings.get("expiry_days", 150),
+    )
     unique_url = f"{qr_base_url}/?id={project_id}"
     file_name = safe_filename(f"{roll}_{name}_{project_title}_{project_id}")
     qr_label = f"{name} | {roll}"
@@ -187,13 +159,27 @@ def create_project_and_qr(
         video_link,
         settings,
     )
-    qr_path = generate_qr(payload, file_name, label=qr_label)
-    set_qr_path(project_id, qr_path)
+    job = {
+        "project_id": project_id,
+        "data": payload,
+        "filename": file_name,
+        "label": qr_label,
+        "previous_path": clean_text(previous_qr_path),
+        **qr_render_options(settings),
+    }
+    _, qr_path = render_qr_job(job)
+    set_qr_path(project_id, qr_path, qr_job_hash(job))
     return project_id, unique_url, qr_path
 
 
-def regenerate_qr_for_row(row, qr_base_url, settings, force=False):
-    # DB order: id,name,roll,title,description,website,video,qr_path,created_at,expires_at
+def plan_qr_job(row, qr_base_url, settings, force=False, only_changed=False):
+    """Return the render job for *row*, or ``None`` when its QR can be kept.
+
+    By default only rows without a QR file are planned.  With *only_changed*
+    rows are also planned when their stored render hash differs from the new
+    job's; *force* plans every row.
+    """
+    # DB order: id,name,roll,title,description,website,video,qr_path,created_at,expires_at,qr_render_hash
     project_id = row[0]
     name = clean_text(row[1])
     roll = clean_text(row[2])
@@ -201,12 +187,11 @@ def regenerate_qr_for_row(row, qr_base_url, settings, force=False):
     project_description = clean_text(row[4] if len(row) > 4 else "")
     video_link = clean_text(row[6] if len(row) > 6 else "")
     qr_path = clean_text(row[7] if len(row) > 7 else "")
+    render_hash = clean_text(row[10] if len(row) > 10 else "")
 
-    if is_valid_image_path(qr_path) and not force:
-        return False
+    if is_valid_image_path(qr_path) and not force and not only_changed:
+        return None
 
-    file_name = safe_filename(f"{roll}_{name}_{project_title}_{project_id}")
-    qr_label = f"{name} | {roll}"
     payload = build_qr_payload(
         qr_base_url,
         project_id,
@@ -217,55 +202,301 @@ def regenerate_qr_for_row(row, qr_base_url, settings, force=False):
         video_link,
         settings,
     )
-    new_path = generate_qr(payload, file_name, label=qr_label)
-    set_qr_path(project_id, new_path)
-    set_project_expiry(
-        project_id,
+    job = {
+        "project_id": project_id,
+        "data": payload,
+        "filename": safe_filename(f"{roll}_{name}_{project_title}_{project_id}"),
+        "label": f"{name} | {roll}",
+        "previous_path": qr_path,
+        **qr_render_options(settings),
+    }
+    if only_changed and not force and is_valid_image_path(qr_path) and render_hash == qr_job_hash(job):
+        return None
+    return job
+
+
+def regenerate_qrs_for_rows(rows, qr_base_url, settings, force=False, only_changed=False):
+    """Regenerate the QRs of *rows*: parallel render, one DB write.
+
+    Returns ``(rendered, skipped)`` counts.
+    """
+    jobs = []
+    skipped = 0
+    for row in rows:
+        job = plan_qr_job(row, qr_base_url, settings, force=force, only_changed=only_changed)
+        if job is None:
+            skipped += 1
+        else:
+            jobs.append(job)
+
+    results = render_qr_batch(jobs)
+    set_qr_paths(
+        results,
         expiry_enabled=settings.get("expiry_enabled", True),
         expiry_days=settings.get("expiry_days", 150),
+        render_hashes={job["project_id"]: qr_job_hash(job) for job in jobs},
     )
-    return True
+    return len(results), skipped
 
 
-def regenerate_all_qrs(qr_base_url, settings):
+def regeneration_summary(rendered, skipped):
+    return f"Re-rendered {rendered} QR(s), {skipped} unchanged."
+
+
+def run_regenerate_job(params, progress):
+    qr_base_url = params["qr_base_url"]
+    settings = params["settings"]
+    force = params.get("force", False)
     rows = get_all_projects()
-    changed = 0
-    for row in rows:
-        if regenerate_qr_for_row(row, qr_base_url, settings, force=True):
-            changed += 1
-    return changed
+    if force:
+        rows = [row for row in rows if clean_text(row[7] if len(row) > 7 else "")]
+    rendered = skipped = 0
+    progress(0, len(rows))
+    for chunk in chunked(rows, QR_JOB_CHUNK_SIZE):
+        chunk_rendered, chunk_skipped = regenerate_qrs_for_rows(
+            chunk, qr_base_url, settings, force=force, only_changed=True
+        )
+        rendered += chunk_rendered
+        skipped += chunk_skipped
+        progress(rendered + skipped)
+    return regeneration_summary(rendered, skipped)
 
 
-def parse_raw_uploaded_records(uploaded_file):
+def run_apply_expiry_job(params, progress):
+    settings = params["settings"]
+    count = apply_expiry_to_all(
+        expiry_enabled=settings.get("expiry_enabled", True),
+        expiry_days=settings.get("expiry_days", 150),
+    )
+    progress(count, count)
+    return f"Updated expiry values for {count} project(s)."
+
+
+def run_sweep_expired_job(params, progress):
+    archive = params.get("archive", True)
+    progress(0, count_expired_projects())
+    removed = 0
+    for batch in sweep_expired(archive=archive, batch_size=QR_JOB_CHUNK_SIZE):
+        for _, qr_path, _ in batch:
+            qr_path = clean_text(qr_path)
+            if is_valid_image_path(qr_path):
+                os.remove(qr_path)
+            if qr_path:
+                remove_qr_thumbnails(qr_path)
+        removed += len(batch)
+        progress(removed)
+    # Videos are shared between projects; only files nobody links any more go.
+    videos_removed, freed = sweep_orphan_videos(VIDEO_UPLOAD_DIR, get_video_reference_counts())
+    action = "Archived" if archive else "Removed"
+    return (
+        f"{action} {removed} expired project(s); removed {videos_removed} unused video file(s), "
+        f"freed {freed / (1024 * 1024):.1f} MB."
+    )
+
+
+def run_import_job(params, progress):
+    path = params["path"]
+    try:
+        with open(path, "rb") as uploaded:
+            valid_rows = (
+                row
+                for row in iter_mapped_import_rows(uploaded, params["mapping"])
+                if is_valid_import_row(row)
+            )
+            success_count = 0
+            for chunk in chunked(valid_rows, IMPORT_CHUNK_SIZE):
+                success_count += import_projects_and_qrs(chunk, params["qr_base_url"], params["settings"])
+                progress(success_count)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return f"Imported {success_count} project(s) and generated QRs."
+
+
+def submit_regenerate_job(qr_base_url, settings, force=False):
+    kind = "replace_qrs" if force else "regenerate_qrs"
+    params = {"qr_base_url": qr_base_url, "settings": settings, "force": force}
+    return submit_job(kind, params)
+
+
+def submit_import_job(uploaded_file, mapping, qr_base_url, settings, total=None):
+    """Spool the upload to disk so the job outlives the Streamlit session."""
+    ext = uploaded_file.name.lower().rsplit(".", 1)[-1]
+    path = os.path.join(JOB_UPLOAD_DIR, f"{uuid.uuid4().hex}.{ext}")
+    uploaded_file.seek(0)
+    write_stream_atomic(uploaded_file, path)
+    params = {"path": path, "mapping": mapping, "qr_base_url": qr_base_url, "settings": settings}
+    return submit_job("import_projects", params, total=total)
+
+
+def cancel_job(job):
+    # The snapshot in *job* may be stale: only a job this call moved from
+    # queued to cancelled will never read its spool file.
+    cancelled = request_job_cancel(job["id"])
+    path = job["params"].get("path")
+    if cancelled and path and os.path.exists(path):
+        os.remove(path)
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
+
+
+def show_job_panel():
+    jobs = get_recent_jobs(5)
+    if not jobs:
+        return
+    with st.expander("Background jobs", expanded=any(job["status"] in {"queued", "running"} for job in jobs)):
+        for job in jobs:
+            label = JOB_LABELS.get(job["kind"], job["kind"])
+            total = job["total"]
+            done = job["done"]
+            if job["status"] == "running":
+                elapsed = max(time.time() - (job["started_at"] or time.time()), 1e-6)
+                rate = done / elapsed
+                text = f"#{job['id']} {label}: {done}/{total if total is not None else '?'}"
+                text += f" ({rate:.1f}/s"
+                if total and rate > 0:
+                    text += f", ETA {format_duration((total - done) / rate)}"
+                text += ")"
+                col_text, col_cancel = st.columns([5, 1])
+                with col_text:
+                    st.progress(min(done / total, 1.0) if total else 0.0, text=text)
+                with col_cancel:
+                    if job["cancel_requested"]:
+                        st.caption("Cancelling...")
+                    elif st.button("Cancel", key=f"cancel_job_{job['id']}"):
+                        cancel_job(job)
+            elif job["status"] == "queued":
+                col_text, col_cancel = st.columns([5, 1])
+                with col_text:
+                    st.caption(f"#{job['id']} {label}: queued")
+                with col_cancel:
+                    if st.button("Cancel", key=f"cancel_job_{job['id']}"):
+                        cancel_job(job)
+            else:
+                took = ""
+                if job["started_at"] and job["finished_at"]:
+                    took = f" in {format_duration(job['finished_at'] - job['started_at'])}"
+                st.caption(f"#{job['id']} {label}: {job['status']}{took}. {job['message'] or ''}")
+
+
+if hasattr(st, "fragment"):
+    # Re-run just the panel so progress updates without rerunning the page.
+    show_job_panel = st.fragment(run_every=JOB_PANEL_REFRESH_SECONDS)(show_job_panel)
+
+
+def import_projects_and_qrs(rows, qr_base_url, settings):
+    """Register many mapped rows at once: one upsert transaction, parallel QR
+    rendering, and one batched qr_path write-back."""
+    upserted = upsert_projects(
+        rows,
+        expiry_enabled=settings.get("expiry_enabled", True),
+        expiry_days=settings.get("expiry_days", 150),
+    )
+    # Rows repeating a project update the same id; the last one wins.
+    jobs_by_id = {}
+    for (project_id, previous_qr_path), row in zip(upserted, rows):
+        db_row = (
+            project_id,
+            row["name"],
+            row["roll"],
+            row["project_title"],
+            row["project_description"],
+            row["video_link"],
+            row["video_link"],
+            previous_qr_path,
+        )
+        jobs_by_id[project_id] = plan_qr_job(db_row, qr_base_url, settings, force=True)
+
+    jobs = list(jobs_by_id.values())
+    set_qr_paths(
+        render_qr_batch(jobs),
+        render_hashes={job["project_id"]: qr_job_hash(job) for job in jobs},
+    )
+    return len(upserted)
+
+
+def iter_raw_uploaded_records(uploaded_file, columns=None):
+    """Yield raw record dicts from an upload, decoding CSV/JSON incrementally.
+
+    For Excel files *columns* limits which columns pandas loads.
+    """
     ext = uploaded_file.name.lower().rsplit(".", 1)[-1]
     if ext == "csv":
-        text_data = uploaded_file.getvalue().decode("utf-8-sig")
-        reader = csv.DictReader(io.StringIO(text_data))
-        return [dict(row) for row in reader]
+        yield from iter_csv_records(uploaded_file)
+        return
     if ext == "json":
-        raw = json.loads(uploaded_file.getvalue().decode("utf-8"))
-        if isinstance(raw, dict):
-            raw = raw.get("projects", [])
-        if not isinstance(raw, list):
-            raise ValueError("JSON must be a list or {'projects': [...]} format.")
-        return [row for row in raw if isinstance(row, dict)]
+        yield from iter_json_records(uploaded_file)
+        return
     if ext in {"xlsx", "xls"}:
         try:
-            import pandas as pd
+            import pandas  # noqa: F401
         except ImportError as exc:
             if ext == "xlsx":
-                return parse_xlsx_without_dependencies(uploaded_file.getvalue())
+                yield from iter_xlsx_records(uploaded_file)
+                return
             raise ValueError("Legacy .xls needs pandas + xlrd. Prefer .xlsx or .csv.") from exc
         try:
-            frame = pd.read_excel(uploaded_file).fillna("")
-            return frame.to_dict(orient="records")
+            if columns is None:
+                columns = read_excel_header(uploaded_file)
+            rows = iter_excel_rows(uploaded_file, columns)
+            first = next(rows, None)
         except Exception:
             if ext == "xlsx":
-                return parse_xlsx_without_dependencies(uploaded_file.getvalue())
+                yield from iter_xlsx_records(uploaded_file)
+                return
             raise
+        if first is not None:
+            yield first
+            yield from rows
+        return
     raise ValueError("Unsupported file type. Use CSV, JSON, XLSX, or XLS.")
 
 
+def parse_raw_uploaded_records(uploaded_file):
+    return list(iter_raw_uploaded_records(uploaded_file))
+
+
+def peek_uploaded_columns(uploaded_file):
+    ext = uploaded_file.name.lower().rsplit(".", 1)[-1]
+    if ext in {"xlsx", "xls"}:
+        try:
+            return read_excel_header(uploaded_file)
+        except ImportError:
+            pass
+        except Exception:
+            if ext == "xls":
+                raise
+    records = iter_raw_uploaded_records(uploaded_file)
+    try:
+        first = next(records, None)
+    finally:
+        records.close()
+    return list(first.keys()) if first else []
+
+
+def iter_mapped_import_rows(uploaded_file, column_mapping):
+    columns = [clean_text(col) for col in column_mapping.values() if clean_text(col)]
+    for row in iter_raw_uploaded_records(uploaded_file, columns=columns):
+        yield map_raw_row(row, column_mapping)
+
+
+def count_import_rows(uploaded_file, column_mapping):
+    total = 0
+    valid = 0
+    for mapped in iter_mapped_import_rows(uploaded_file, column_mapping):
+        total += 1
+        if is_valid_import_row(mapped):
+            valid += 1
+    return total, valid
+
+
 def default_mapping_from_columns(columns):
     normalized = {normalize_key(col): col for col in columns}
     alias_map = {
@@ -356,6 +587,38 @@ def show_admin_settings(settings, qr_base_url):
             format_func=lambda value: "URL only" if value == "url_only" else "URL + Full Data",
         )
 
+        st.subheader("QR Image Output")
+        qr_output_format = st.radio(
+            "QR file format",
+            ["png", "svg"],
+            index=1 if settings.get("qr_output_format", "png") == "svg" else 0,
+            format_func=lambda value: "PNG" if value == "png" else "SVG (vector, print-ready)",
+        )
+        png_modes = ["palette", "1bit", "rgb"]
+        current_png_mode = settings.get("qr_png_mode", "palette")
+        qr_png_mode = st.selectbox(
+            "PNG colour mode",
+            png_modes,
+            index=png_modes.index(current_png_mode) if current_png_mode in png_modes else 0,
+            format_func=lambda value: {
+                "palette": "2-colour palette (smallest)",
+                "1bit": "1-bit black/white",
+                "rgb": "24-bit RGB (legacy)",
+            }[value],
+        )
+        qr_png_compress_level = st.slider(
+            "PNG compression level (zlib)",
+            min_value=0,
+            max_value=9,
+            value=int(settings.get("qr_png_compress_level", 6)),
+            step=1,
+        )
+        qr_png_optimize = st.checkbox(
+            "Optimize PNG encoding (slower, slightly smaller files)",
+            value=settings.get("qr_png_optimize", False),
+        )
+        st.caption("Output changes apply to new QRs; use Regenerate All QRs Now to rewrite existing ones.")
+
         st.subheader("Validity")
         expiry_enabled = st.checkbox("Enable QR expiry", value=settings.get("expiry_enabled", True))
         expiry_days = st.number_input(
@@ -367,6 +630,16 @@ def show_admin_settings(settings, qr_base_url):
             disabled=not expiry_enabled,
         )
 
+        st.subheader("Uploads")
+        max_video_upload_mb = st.number_input(
+            "Max video upload size (MB)",
+            min_value=1,
+            max_value=10000,
+            value=int(settings.get("max_video_upload_mb", 200)),
+            step=1,
+        )
+        st.caption("Streamlit's own server.maxUploadSize (default 200 MB) must be at least this large.")
+
         st.subheader("Mobile Layout")
         video_fit = st.selectbox(
             "Video fit mode",
@@ -394,6 +667,13 @@ def show_admin_settings(settings, qr_base_url):
             value=int(settings.get("grid_columns", 6)),
             step=1,
         )
+        grid_page_size = st.number_input(
+            "Projects per page (View All Projects)",
+            min_value=6,
+            max_value=500,
+            value=int(settings.get("grid_page_size", 48)),
+            step=6,
+        )
 
         submitted = st.form_submit_button("Save Settings")
 
@@ -408,19 +688,26 @@ def show_admin_settings(settings, qr_base_url):
             "manual_qr_base_url": clean_text(manual_qr_base_url).rstrip("/"),
             "auto_update_qr_urls": auto_update_qr_urls,
             "qr_payload_mode": qr_payload_mode,
+            "qr_output_format": qr_output_format,
+            "qr_png_mode": qr_png_mode,
+            "qr_png_compress_level": int(qr_png_compress_level),
+            "qr_png_optimize": qr_png_optimize,
             "expiry_enabled": expiry_enabled,
             "expiry_days": int(expiry_days),
+            "max_video_upload_mb": int(max_video_upload_mb),
             "video_fit": video_fit,
             "font_scale": float(font_scale),
             "spacing_scale": float(spacing_scale),
             "grid_columns": int(grid_columns),
+            "grid_page_size": int(grid_page_size),
         }
         updated_base = compute_qr_base_url(updated)
-        old_base = clean_text(updated.get("last_qr_base_url", ""))
 
-        if updated.get("auto_update_qr_urls", True) and old_base != updated_base:
-            regenerated = regenerate_all_qrs(updated_base, updated)
-            st.success(f"Settings saved. Base URL changed. Regenerated {regenerated} QR(s).")
+        if updated.get("auto_update_qr_urls", True):
+            # Only rows whose payload or render settings changed are re-rendered,
+            # so saving e.g. expiry or layout settings renders nothing.
+            submit_regenerate_job(updated_base, updated)
+            st.success("Settings saved. QR regeneration queued.")
             updated["last_qr_base_url"] = updated_base
         else:
             st.success("Settings saved.")
@@ -431,34 +718,43 @@ def show_admin_settings(settings, qr_base_url):
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Regenerate All QRs Now"):
-            regenerated = regenerate_all_qrs(qr_base_url, settings)
+            submit_regenerate_job(qr_base_url, settings)
             settings["last_qr_base_url"] = qr_base_url
             save_settings(settings)
-            st.success(f"Regenerated {regenerated} QR(s).")
+            st.success("QR regeneration queued.")
     with col2:
         if st.button("Apply Expiry Rules to Existing Projects"):
-            count = 0
-            for row in get_all_projects():
-                set_project_expiry(
-                    row[0],
-                    expiry_enabled=settings.get("expiry_enabled", True),
-                    expiry_days=settings.get("expiry_days", 150),
-                )
-                count += 1
-            st.success(f"Updated expiry values for {count} project(s).")
+            submit_job("apply_expiry", {"settings": settings})
+            st.success("Expiry update queued.")
+
+    if settings.get("expiry_enabled", True):
+        archive_expired = st.checkbox("Keep swept projects in the archive table", value=True)
+        if st.button("Sweep Expired Projects"):
+            submit_job("sweep_expired", {"archive": archive_expired})
+            st.success("Expired project sweep queued.")
+
+    if st.button("Remove Unused Uploaded Videos"):
+        removed, freed = sweep_orphan_videos(VIDEO_UPLOAD_DIR, get_video_reference_counts())
+        st.success(f"Removed {removed} unused video file(s), freed {freed / (1024 * 1024):.1f} MB.")
 
 
 init_db()
+register_handler("regenerate_qrs", run_regenerate_job)
+register_handler("replace_qrs", run_regenerate_job)
+register_handler("apply_expiry", run_apply_expiry_job)
+register_handler("import_projects", run_import_job)
+register_handler("sweep_expired", run_sweep_expired_job)
+ensure_worker()
 settings = load_settings()
 QR_BASE_URL = compute_qr_base_url(settings)
 
 if settings.get("auto_update_qr_urls", True):
     last_base = clean_text(settings.get("last_qr_base_url", ""))
     if last_base != QR_BASE_URL:
-        regenerated_count = regenerate_all_qrs(QR_BASE_URL, settings)
+        submit_regenerate_job(QR_BASE_URL, settings)
         settings["last_qr_base_url"] = QR_BASE_URL
         save_settings(settings)
-        st.session_state["auto_regenerated_notice"] = regenerated_count
+        st.session_state["auto_regenerated_notice"] = "QR regeneration queued."
 
 st.set_page_config(
     page_title="NEX AI QR Registration",
@@ -470,7 +766,8 @@ apply_global_styles()
 st.title("🎓 NEX AI Project Registration System")
 
 if "auto_regenerated_notice" in st.session_state:
-    st.info(f"Base URL changed. Auto-regenerated {st.session_state.pop('auto_regenerated_notice')} QR(s).")
+    st.info(f"Base URL changed. {st.session_state.pop('auto_regenerated_notice')}")
+show_job_panel()
 
 menu = st.sidebar.selectbox(
     "Menu",
@@ -498,7 +795,15 @@ if menu == "Register Project":
         project_title = clean_text(project_title)
         project_description = clean_text(project_description)
         video_web_link = clean_text(video_web_link)
-        local_video_link = save_uploaded_video(local_video_file, QR_BASE_URL)
+        try:
+            local_video_link = save_uploaded_video(
+                local_video_file,
+                QR_BASE_URL,
+                max_bytes=int(settings.get("max_video_upload_mb", 200)) * 1024 * 1024,
+            )
+        except UploadTooLarge as exc:
+            st.error(str(exc))
+            st.stop()
         # Prefer web link when both are provided.
         video_link = video_web_link or local_video_link
 
@@ -516,7 +821,7 @@ if menu == "Register Project":
                 st.info("Both link and local video were provided. Web link was used by priority.")
             st.success("Registration successful.")
             st.subheader("Generated QR Code")
-            st.image(qr_path, width=250)
+            show_qr_image(qr_path, width=250)
             st.subheader("QR Redirect URL")
             st.write(unique_url)
         else:
@@ -536,13 +841,12 @@ elif menu == "Bulk Import":
     uploaded = st.file_uploader("Upload file", type=["csv", "json", "xlsx", "xls"])
     if uploaded:
         try:
-            raw_records = parse_raw_uploaded_records(uploaded)
+            columns = peek_uploaded_columns(uploaded)
         except Exception as exc:
             st.error(f"Import error: {exc}")
-            raw_records = []
+            columns = []
 
-        if raw_records:
-            columns = list(raw_records[0].keys())
+        if columns:
             st.subheader("Column Mapping")
             default_map = default_mapping_from_columns(columns)
             mapping = {}
@@ -556,69 +860,64 @@ elif menu == "Bulk Import":
                     key=f"map_{field}",
                 )
 
-            mapped_rows = [map_raw_row(row, mapping) for row in raw_records]
-            valid_rows = [row for row in mapped_rows if is_valid_import_row(row)]
-            st.write(f"Rows found: {len(raw_records)}")
-            st.write(f"Valid rows: {len(valid_rows)}")
-            st.write(f"Invalid rows skipped: {len(raw_records) - len(valid_rows)}")
+            try:
+                total_rows, valid_count = count_import_rows(uploaded, mapping)
+            except Exception as exc:
+                st.error(f"Import error: {exc}")
+                total_rows, valid_count = 0, 0
+            st.write(f"Rows found: {total_rows}")
+            st.write(f"Valid rows: {valid_count}")
+            st.write(f"Invalid rows skipped: {total_rows - valid_count}")
 
             if st.button("Import and Generate QRs"):
-                success_count = 0
-                for row in valid_rows:
-                    create_project_and_qr(
-                        row["name"],
-                        row["roll"],
-                        row["project_title"],
-                        row["project_description"],
-                        row["video_link"],
-                        QR_BASE_URL,
-                        settings,
-                    )
-                    success_count += 1
-                st.success(f"Imported {success_count} project(s) and generated QRs.")
+                submit_import_job(uploaded, mapping, QR_BASE_URL, settings, total=valid_count)
+                st.success(f"Import of {valid_count} row(s) queued.")
 
 elif menu == "View All Projects":
     st.header("Registered Projects")
-    data = get_all_projects()
 
     col_a, col_b, col_c = st.columns([1, 1, 2])
     with col_a:
         if st.button("Update All QRs"):
-            regenerated = regenerate_all_qrs(QR_BASE_URL, settings)
+            submit_regenerate_job(QR_BASE_URL, settings)
             settings["last_qr_base_url"] = QR_BASE_URL
             save_settings(settings)
-            st.success(f"Updated/Replaced {regenerated} QR(s).")
-            data = get_all_projects()
+            st.success("QR update queued.")
     with col_b:
         if st.button("Replace Existing QRs"):
-            replaced = 0
-            for row in data:
-                qr_path = clean_text(row[7] if len(row) > 7 else "")
-                if qr_path:
-                    if regenerate_qr_for_row(row, QR_BASE_URL, settings, force=True):
-                        replaced += 1
+            submit_regenerate_job(QR_BASE_URL, settings, force=True)
             settings["last_qr_base_url"] = QR_BASE_URL
             save_settings(settings)
-            st.success(f"Replaced {replaced} existing QR(s).")
-            data = get_all_projects()
+            st.success("QR replacement queued.")
     with col_c:
         st.caption(f"QR base URL: {QR_BASE_URL}")
 
-    if data:
+    page_size = int(settings.get("grid_page_size", 48))
+    change_id = get_latest_change_id()
+    page = int(st.session_state.get("grid_page", 1))
+    entries, total = load_projects_grid_page(change_id, page, page_size)
+    if total:
+        page_count = (total + page_size - 1) // page_size
+        if page > page_count:
+            page = page_count
+            entries, total = load_projects_grid_page(change_id, page, page_size)
+        st.session_state["grid_page"] = page
+        st.number_input("Page", min_value=1, max_value=page_count, step=1, key="grid_page")
+        first = (page - 1) * page_size + 1
+        st.caption(f"Showing {first}-{first + len(entries) - 1} of {total} project(s), page {page} of {page_count}.")
+
         per_row = int(settings.get("grid_columns", 6))
-        for start in range(0, len(data), per_row):
+        for start in range(0, len(entries), per_row):
             cols = st.columns(per_row)
-            chunk = data[start:start + per_row]
-            for idx, row in enumerate(chunk):
+            for idx, (row, thumb_path) in enumerate(entries[start:start + per_row]):
                 with cols[idx]:
                     st.markdown(f"**{clean_text(row[3])}**")
                     st.caption(f"{clean_text(row[1])} | {clean_text(row[2])}")
-                    qr_path = row[7] if len(row) > 7 else ""
-                    if is_valid_image_path(qr_path):
-                        st.image(qr_path, width="stretch")
-                    elif clean_text(qr_path):
+                    if thumb_path:
+                        show_qr_image(thumb_path, width="stretch")
+                    elif clean_text(row[7]):
                         st.caption("QR image missing")
-                    video_value = clean_text(row[6] if len(row) > 6 else "")
+                    video_value = clean_text(row[6])
                     if video_value:
                         st.markdown(f"[Open Link]({video_value})")
     else:
@@ -0,0 +1,61 @@
+"""Compare output modes of generate_qr: bytes per file and ms per file.
+
+Run from the project root:
+
+    python benchmarks/qr_output_modes.py --count 200
+
+Files are written to a temporary directory and the render cache is bypassed,
+so every iteration measures a full encode + render + save.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.qr_generator import PNG_MODES, generate_qr  # noqa: E402
+
+
+def run_mode(mode, count, compress_level, optimize):
+    total_bytes = 0
+    started = time.perf_counter()
+    for index in range(count):
+        path = generate_qr(
+            f"http://192.168.1.25:5000/?id={index}",
+            f"bench_{mode}_{index}",
+            label=f"Student {index} | 21CS{index:04d}",
+            output_format="svg" if mode == "svg" else "png",
+            png_mode=mode,
+            compress_level=compress_level,
+            optimize=optimize,
+            use_cache=False,
+        )
+        total_bytes += os.path.getsize(path)
+    elapsed = time.perf_counter() - started
+    return total_bytes / count, elapsed * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--compress-level", type=int, default=6)
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            print(f"{'mode':<10}{'bytes/file':>14}{'ms/file':>12}")
+            for mode in (*PNG_MODES, "svg"):
+                size, ms = run_mode(mode, args.count, args.compress_level, args.optimize)
+                print(f"{mode:<10}{size:>14.0f}{ms:>12.2f}")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Concurrent seek benchmark for the /uploaded_videos route.
+
+Run from the project root:
+
+    python benchmarks/video_range_requests.py --size-mb 200 --clients 16 --seeks 40
+
+A temporary video file is served by web_app on a local threaded server.
+Each client issues random ``Range`` requests the way a <video> player seeks
+(open-ended ``bytes=N-`` reads abandoned after ``--read-kb``, plus bounded
+ranges).  The same load is replayed against a plain ``send_from_directory``
+route for comparison.  Reported per route: p50/p95 latency, bytes read, and
+worker occupancy (summed request time / wall time, i.e. the average number
+of server threads kept busy).
+"""
+
+import argparse
+import http.client
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import send_from_directory  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+import web_app  # noqa: E402
+
+
+def run_client(port, prefix, size, seeks, read_kb, timings, rng):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    total = 0
+    for _ in range(seeks):
+        start = rng.randrange(0, size - 1)
+        if rng.random() < 0.5:
+            range_value = f"bytes={start}-"
+        else:
+            range_value = f"bytes={start}-{min(size - 1, start + read_kb * 1024 - 1)}"
+        began = time.perf_counter()
+        conn.request("GET", f"{prefix}/bench.mp4", headers={"Range": range_value})
+        response = conn.getresponse()
+        data = response.read(read_kb * 1024)
+        total += len(data)
+        if response.length:
+            # Player abandoned the rest of an open-ended read: drop the connection.
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        else:
+            response.read()
+        timings.append(time.perf_counter() - began)
+    conn.close()
+    return total
+
+
+def run_load(port, prefix, size, clients, seeks, read_kb):
+    timings = []
+    totals = []
+    threads = []
+    began = time.perf_counter()
+    for index in range(clients):
+        rng = random.Random(index)
+        thread = threading.Thread(
+            target=lambda rng=rng: totals.append(
+                run_client(port, prefix, size, seeks, read_kb, timings, rng)
+            )
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - began
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+        "mb_read": sum(totals) / (1024 * 1024),
+        "occupancy": sum(timings) / wall,
+        "wall_s": wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seeks", type=int, default=25)
+    parser.add_argument("--read-kb", type=int, default=512)
+    args = parser.parse_args()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as video_dir:
+        size = args.size_mb * 1024 * 1024
+        with open(os.path.join(video_dir, "bench.mp4"), "wb") as file_obj:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.size_mb):
+                file_obj.write(block)
+
+        web_app.UPLOADED_VIDEOS_DIR = video_dir
+        web_app.app.add_url_rule(
+            "/legacy_videos/<path:filename>",
+            "legacy_videos",
+            lambda filename: send_from_directory(video_dir, filename, as_attachment=False),
+        )
+        server = make_server("127.0.0.1", 0, web_app.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            print(f"{'route':<18}{'p50 ms':>10}{'p95 ms':>10}{'MB read':>10}{'occupancy':>11}")
+            for label, prefix in (("ranged (new)", "/uploaded_videos"), ("send_from_dir", "/legacy_videos")):
+                result = run_load(server.port, prefix, size, args.clients, args.seeks, args.read_kb)
+                print(
+                    f"{label:<18}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                    f"{result['mb_read']:>10.1f}{result['occupancy']:>11.2f}"
+                )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
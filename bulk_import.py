@@ -1,5 +1,6 @@
 import csv
 import io
+import itertools
 import json
 import re
 import xml.etree.ElementTree as ET
@@ -45,6 +46,10 @@ FIELD_ALIASES = {
 
 REQUIRED_FIELDS = ["name", "roll", "project_title", "project_description"]
 
+STREAM_CHUNK_SIZE = 64 * 1024
+# Characters that can extend a JSON number cut off at a chunk boundary.
+NUMBER_CONTINUATION_CHARS = frozenset("0123456789.eE+-")
+
 BULK_REQUIRED_COLUMNS_TEXT = (
     "Required columns: Team Leader Name, Team Leader Roll No, "
     "Title of the Project, Project Description"
@@ -75,132 +80,382 @@ def normalize_record(record):
     return mapped
 
 
+def resolve_field_columns(columns):
+    """Map each field to the source columns that can fill it, in alias order.
+
+    Normalizes the header once so rows can be projected with
+    :func:`project_record` instead of running :func:`normalize_record` per row.
+    """
+    normalized = {normalize_key(col): col for col in columns}
+    field_columns = {}
+    for field, aliases in FIELD_ALIASES.items():
+        candidates = []
+        for alias in aliases:
+            col = normalized.get(normalize_key(alias))
+            if col is not None and col not in candidates:
+                candidates.append(col)
+        field_columns[field] = candidates
+    return field_columns
+
+
+def project_record(row, field_columns):
+    """Same result as ``normalize_record(row)`` for a header resolved up front."""
+    mapped = {}
+    for field, candidates in field_columns.items():
+        value = ""
+        for col in candidates:
+            value = clean_text(row.get(col, ""))
+            if value:
+                break
+        mapped[field] = value
+    return mapped
+
+
 def validate_record(record):
     return all(clean_text(record.get(field, "")) for field in REQUIRED_FIELDS)
 
 
-def parse_uploaded_records(uploaded_file):
+def chunked(iterable, size):
+    """Yield lists of at most *size* items from *iterable*."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text_stream(binary_file, encoding):
+    binary_file.seek(0)
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline="")
+
+
+def iter_csv_records(binary_file):
+    """Yield CSV rows as dicts, decoding the upload incrementally."""
+    text_stream = _text_stream(binary_file, "utf-8-sig")
+    try:
+        for row in csv.DictReader(text_stream):
+            yield dict(row)
+    finally:
+        # Detach so closing the wrapper does not close the upload itself.
+        text_stream.detach()
+
+
+def iter_json_records(binary_file, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield dict items of a JSON upload.
+
+    A top-level list is decoded element by element from a bounded buffer.
+    The ``{"projects": [...]}`` form is parsed in one go.
+    """
+    text_stream = _text_stream(binary_file, "utf-8")
+    try:
+        decoder = json.JSONDecoder()
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            data = text_stream.read(chunk_size)
+            if not data:
+                eof = True
+            buffer = buffer[pos:] + data
+            pos = 0
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip(" \t\r\n")
+        if pos >= len(buffer):
+            raise ValueError("JSON must be a list or {\"projects\": [...]} format.")
+        if buffer[pos] == "{":
+            raw = json.loads(buffer[pos:] + text_stream.read())
+            raw = raw.get("projects", [])
+            if not isinstance(raw, list):
+                raise ValueError("JSON must be a list or {\"projects\": [...]} format.")
+            for item in raw:
+                if isinstance(item, dict):
+                    yield item
+            return
+        if buffer[pos] != "[":
+            raise ValueError("JSON must be a list or {\"projects\": [...]} format.")
+        pos += 1
+
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buffer):
+                raise ValueError("Unexpected end of JSON list.")
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if not eof and (
+                end == len(buffer)
+                or (
+                    isinstance(item, (int, float))
+                    and not isinstance(item, bool)
+                    and all(char in NUMBER_CONTINUATION_CHARS for char in buffer[end:])
+                )
+            ):
+                # A scalar may continue in the next chunk (``12.`` | ``5``,
+                # ``1e`` | ``3``); decode it again with more input.
+                fill()
+                continue
+            pos = end
+            if isinstance(item, dict):
+                yield item
+    finally:
+        text_stream.detach()
+
+
+def iter_uploaded_records(uploaded_file):
+    """Yield normalized records from an upload without building full lists."""
     ext = uploaded_file.name.lower().rsplit(".", 1)[-1]
 
     if ext == "csv":
-        text_data = uploaded_file.getvalue().decode("utf-8-sig")
-        reader = csv.DictReader(io.StringIO(text_data))
-        return [normalize_record(row) for row in reader]
+        for row in iter_csv_records(uploaded_file):
+            yield normalize_record(row)
+        return
 
     if ext == "json":
-        raw = json.loads(uploaded_file.getvalue().decode("utf-8"))
-        if isinstance(raw, dict):
-            raw = raw.get("projects", [])
-        if not isinstance(raw, list):
-            raise ValueError("JSON must be a list or {\"projects\": [...]} format.")
-        return [normalize_record(row) for row in raw if isinstance(row, dict)]
+        for row in iter_json_records(uploaded_file):
+            yield normalize_record(row)
+        return
 
     if ext == "xlsx":
         try:
-            import pandas as pd
-
-            frame = pd.read_excel(uploaded_file).fillna("")
-            return [normalize_record(row) for row in frame.to_dict(orient="records")]
+            field_columns = resolve_field_columns(read_excel_header(uploaded_file))
+            wanted = [col for candidates in field_columns.values() for col in candidates]
+            rows = iter_excel_rows(uploaded_file, wanted)
+            first = next(rows, None)
         except Exception:
-            return parse_xlsx_without_dependencies(uploaded_file.getvalue())
+            yield from iter_xlsx_records(uploaded_file)
+            return
+        if first is not None:
+            yield project_record(first, field_columns)
+        for row in rows:
+            yield project_record(row, field_columns)
+        return
 
     if ext == "xls":
         try:
-            import pandas as pd
-
-            frame = pd.read_excel(uploaded_file).fillna("")
-            return [normalize_record(row) for row in frame.to_dict(orient="records")]
+            field_columns = resolve_field_columns(read_excel_header(uploaded_file))
+            wanted = [col for candidates in field_columns.values() for col in candidates]
+            rows = iter_excel_rows(uploaded_file, wanted)
+            first = next(rows, None)
         except Exception as exc:
             raise ValueError(
                 "Legacy .xls import needs optional Excel dependencies. "
                 "Use CSV/JSON/XLSX, or install: pip install pandas xlrd"
             ) from exc
+        if first is not None:
+            yield project_record(first, field_columns)
+        for row in rows:
+            yield project_record(row, field_columns)
+        return
 
     raise ValueError("Unsupported file type. Use CSV, JSON, XLSX, or XLS.")
 
 
-def parse_xlsx_without_dependencies(raw_bytes):
-    ns = {
-        "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
-        "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+def parse_uploaded_records(uploaded_file):
+    return list(iter_uploaded_records(uploaded_file))
+
+
+def read_excel_header(uploaded_file):
+    """Return the header row of an Excel upload as strings, via pandas."""
+    import pandas as pd
+
+    uploaded_file.seek(0)
+    frame = pd.read_excel(uploaded_file, nrows=0)
+    return [str(col) for col in frame.columns]
+
+
+def iter_excel_rows(uploaded_file, columns):
+    """Yield Excel rows as ``{column: str}`` dicts, loading only *columns*.
+
+    Cells are read with string dtype and no NA conversion, so pandas skips
+    type inference and unmapped columns are never materialized.  With no
+    columns requested, only the row count is preserved (empty dicts).
+    """
+    import pandas as pd
+
+    wanted = set(columns)
+    uploaded_file.seek(0)
+    if not wanted:
+        frame = pd.read_excel(uploaded_file, usecols=[0], dtype=str, keep_default_na=False)
+        for _ in range(len(frame)):
+            yield {}
+        return
+
+    frame = pd.read_excel(
+        uploaded_file,
+        usecols=lambda col: str(col) in wanted,
+        dtype=str,
+        keep_default_na=False,
+    )
+    names = [str(col) for col in frame.columns]
+    for values in zip(*(frame[col].tolist() for col in frame.columns)):
+        yield dict(zip(names, values))
+
+
+XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+XLSX_DOC_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+
+def _column_index(cell_ref):
+    index = 0
+    for ch in cell_ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + (ord(ch.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _joined_text(node):
+    return "".join(t.text or "" for t in node.iter(f"{XLSX_MAIN_NS}t"))
+
+
+def _numeric_text(value):
+    # Excel stores every number as a float; show whole numbers like 101 as "101".
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number.is_integer() and "e" not in value.lower() and abs(number) < 1e15:
+        return str(int(number))
+    return value
+
+
+def _iter_shared_strings(stream):
+    for _, elem in ET.iterparse(stream, events=("end",)):
+        if elem.tag == f"{XLSX_MAIN_NS}si":
+            yield _joined_text(elem)
+            elem.clear()
+
+
+def _xlsx_sheet_path(zf, sheet):
+    workbook_root = ET.fromstring(zf.read("xl/workbook.xml"))
+    workbook_rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    rel_map = {
+        rel.attrib.get("Id"): rel.attrib.get("Target", "")
+        for rel in workbook_rels.iter(f"{XLSX_REL_NS}Relationship")
     }
 
-    def text_or_empty(node):
-        return "" if node is None or node.text is None else node.text
+    sheets = list(workbook_root.iter(f"{XLSX_MAIN_NS}sheet"))
+    if isinstance(sheet, str):
+        sheets = [node for node in sheets if node.attrib.get("name") == sheet]
+        chosen = sheets[0] if sheets else None
+    else:
+        chosen = sheets[sheet] if 0 <= sheet < len(sheets) else None
+    if chosen is None:
+        return ""
+
+    target = rel_map.get(chosen.attrib.get(XLSX_DOC_REL_ID), "")
+    if not target:
+        return ""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return target if target.startswith("xl/") else f"xl/{target}"
+
+
+def _iter_sheet_rows(stream, shared):
+    """Yield each sheet row as ``{column_index: text}``, clearing parsed XML."""
+    sheet_data = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if elem.tag == f"{XLSX_MAIN_NS}sheetData":
+                sheet_data = elem
+            continue
+        if elem.tag != f"{XLSX_MAIN_NS}row":
+            continue
+
+        row_data = {}
+        next_index = 0
+        for cell in elem.iter(f"{XLSX_MAIN_NS}c"):
+            ref = cell.attrib.get("r", "")
+            index = _column_index(ref) if ref else next_index
+            next_index = index + 1
+            ctype = cell.attrib.get("t", "n")
+            value_node = cell.find(f"{XLSX_MAIN_NS}v")
+            raw = "" if value_node is None or value_node.text is None else value_node.text
+
+            if ctype == "inlineStr":
+                inline = cell.find(f"{XLSX_MAIN_NS}is")
+                value = "" if inline is None else _joined_text(inline)
+            elif ctype == "s":
+                idx = int(raw) if raw.isdigit() else -1
+                value = shared[idx] if 0 <= idx < len(shared) else ""
+            elif ctype == "b":
+                value = "TRUE" if raw == "1" else "FALSE" if raw == "0" else ""
+            elif ctype == "e":
+                value = ""
+            elif ctype == "n" and raw:
+                value = _numeric_text(raw)
+            else:
+                value = raw
+
+            row_data[index] = clean_text(value)
+        yield row_data
 
-    def col_letters(cell_ref):
-        return "".join(ch for ch in cell_ref if ch.isalpha())
+        elem.clear()
+        if sheet_data is not None:
+            # Drop already processed rows so memory stays flat.
+            sheet_data.clear()
 
-    with zipfile.ZipFile(io.BytesIO(raw_bytes)) as zf:
+
+def iter_xlsx_records(source, sheet=0):
+    """Stream normalized records from an ``.xlsx`` file without extra packages.
+
+    *source* is the raw bytes or a binary file object.  *sheet* is a
+    0-based sheet index or a sheet name.  Sheet XML is read straight out of
+    the zip member with ``iterparse``; the first row provides the headers.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    else:
+        source.seek(0)
+
+    with zipfile.ZipFile(source) as zf:
         shared = []
         if "xl/sharedStrings.xml" in zf.namelist():
-            shared_root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
-            for item in shared_root.findall("main:si", ns):
-                parts = [text_or_empty(t) for t in item.findall(".//main:t", ns)]
-                shared.append("".join(parts))
-
-        workbook_root = ET.fromstring(zf.read("xl/workbook.xml"))
-        workbook_rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
-
-        rel_map = {
-            rel.attrib.get("Id"): rel.attrib.get("Target", "")
-            for rel in workbook_rels.findall("rel:Relationship", ns)
-        }
-
-        first_sheet = workbook_root.find("main:sheets/main:sheet", ns)
-        if first_sheet is None:
-            return []
-
-        rel_id = first_sheet.attrib.get(
-            "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
-        )
-        target = rel_map.get(rel_id, "")
-        if not target:
-            return []
-
-        sheet_path = target if target.startswith("xl/") else f"xl/{target.lstrip('/')}"
-        sheet_root = ET.fromstring(zf.read(sheet_path))
-
-        rows = []
-        for row in sheet_root.findall("main:sheetData/main:row", ns):
-            row_data = {}
-            for cell in row.findall("main:c", ns):
-                ref = cell.attrib.get("r", "")
-                key = col_letters(ref)
-                ctype = cell.attrib.get("t", "")
-                value = ""
-
-                if ctype == "inlineStr":
-                    value = text_or_empty(cell.find("main:is/main:t", ns))
-                elif ctype == "s":
-                    idx_text = text_or_empty(cell.find("main:v", ns))
-                    if idx_text.isdigit():
-                        idx = int(idx_text)
-                        value = shared[idx] if 0 <= idx < len(shared) else ""
-                else:
-                    value = text_or_empty(cell.find("main:v", ns))
-
-                row_data[key] = clean_text(value)
-            rows.append(row_data)
-
-    if not rows:
-        return []
-
-    headers_by_col = {
-        col: clean_text(value)
-        for col, value in rows[0].items()
-        if clean_text(value)
-    }
-    if not headers_by_col:
-        return []
-
-    records = []
-    for row in rows[1:]:
-        record = {}
-        for col, header in headers_by_col.items():
-            record[header] = clean_text(row.get(col, ""))
-        records.append(normalize_record(record))
-    return records
+            with zf.open("xl/sharedStrings.xml") as stream:
+                shared = list(_iter_shared_strings(stream))
+
+        sheet_path = _xlsx_sheet_path(zf, sheet)
+        if not sheet_path or sheet_path not in zf.namelist():
+            return
+
+        with zf.open(sheet_path) as stream:
+            field_cells = None
+            for row_data in _iter_sheet_rows(stream, shared):
+                if field_cells is None:
+                    headers_by_col = {col: value for col, value in row_data.items() if value}
+                    if not headers_by_col:
+                        return
+                    field_columns = resolve_field_columns(headers_by_col.values())
+                    col_by_header = {header: col for col, header in headers_by_col.items()}
+                    field_cells = {
+                        field: [col_by_header[header] for header in candidates]
+                        for field, candidates in field_columns.items()
+                    }
+                    continue
+                yield project_record(row_data, field_cells)
+
+
+def parse_xlsx_without_dependencies(raw_bytes, sheet=0):
+    return list(iter_xlsx_records(raw_bytes, sheet=sheet))
 
 
 def sample_csv_template():
@@ -1,8 +1,61 @@
+import json
+import logging
+import os
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 
+DATABASE = "expo.db"
+# Tunables, overridable from the environment (sizes in bytes / KiB).
+DB_BUSY_TIMEOUT = float(os.getenv("EXPO_DB_BUSY_TIMEOUT", "30"))
+DB_MMAP_SIZE = int(os.getenv("EXPO_DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv("EXPO_DB_CACHE_SIZE_KB", "16384"))
+
+PROJECT_CHANGES_KEEP = 50000
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+
+def _open_connection():
+    conn = sqlite3.connect(DATABASE, timeout=DB_BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT * 1000)}")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def get_connection():
+    """Return this thread's shared connection to ``expo.db``.
+
+    Connections are opened once per thread (and per process, so forked workers
+    never reuse a parent's handle) with WAL journaling, so Flask scans keep
+    reading while Streamlit imports write.  A transaction left open by a failed
+    caller is rolled back (with a warning) before the connection is handed out
+    again.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        conn = _open_connection()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    elif conn.in_transaction:
+        logger.warning("Rolling back a transaction left open on this thread's connection.")
+        conn.rollback()
+    return conn
+
+
+def identity_key(value):
+    """Normalized form of roll / project title used to identify a project."""
+    return (value or "").strip().lower()
+
+
 def init_db():
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
 
     c.execute("""
@@ -26,9 +79,132 @@ def init_db():
         c.execute("ALTER TABLE projects ADD COLUMN created_at TEXT")
     if "expires_at" not in cols:
         c.execute("ALTER TABLE projects ADD COLUMN expires_at TEXT")
+    if "roll_key" not in cols:
+        c.execute("ALTER TABLE projects ADD COLUMN roll_key TEXT")
+    if "title_key" not in cols:
+        c.execute("ALTER TABLE projects ADD COLUMN title_key TEXT")
+    if "updated_at" not in cols:
+        c.execute("ALTER TABLE projects ADD COLUMN updated_at TEXT")
+    if "qr_render_hash" not in cols:
+        c.execute("ALTER TABLE projects ADD COLUMN qr_render_hash TEXT")
+
+    c.execute("SELECT id, roll, project_title FROM projects WHERE roll_key IS NULL OR title_key IS NULL")
+    c.executemany(
+        "UPDATE projects SET roll_key = ?, title_key = ? WHERE id = ?",
+        [(identity_key(roll), identity_key(title), pid) for pid, roll, title in c.fetchall()],
+    )
+    conn.commit()
 
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_projects_identity'")
+    if c.fetchone() is None:
+        # Existing duplicates would violate the unique index; merge them first.
+        deduplicate_projects()
+        c.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_identity ON projects (roll_key, title_key)"
+        )
+        conn.commit()
+    # Prefix search on titles (roll prefixes use the identity index).
+    c.execute("CREATE INDEX IF NOT EXISTS idx_projects_title_key ON projects (title_key)")
+    # Expiry sweeps find expired rows without scanning the table.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_projects_expires_at ON projects (expires_at)")
+    conn.commit()
+
+    # Expired projects moved out of the hot table by sweep_expired().
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS projects_archive (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            roll TEXT,
+            project_title TEXT,
+            project_description TEXT,
+            website_link TEXT,
+            video_link TEXT,
+            qr_path TEXT,
+            created_at TEXT,
+            expires_at TEXT,
+            archived_at TEXT
+        )
+        """
+    )
+    conn.commit()
+
+    # Append-only change feed so other processes (the Flask page cache) can
+    # invalidate exactly the projects that were written.  Triggers cover every
+    # write path; old entries are pruned as the feed grows.
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER
+        )
+        """
+    )
+    for event, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS projects_change_{event.lower()}
+            AFTER {event} ON projects
+            BEGIN
+                INSERT INTO project_changes (project_id) VALUES ({ref}.id);
+            END
+            """
+        )
+    # Keep updated_at current for HTTP Last-Modified; the WHEN clause stops
+    # the trigger's own UPDATE from firing it again.
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS projects_touch_insert
+        AFTER INSERT ON projects
+        WHEN NEW.updated_at IS NULL
+        BEGIN
+            UPDATE projects SET updated_at = strftime('%Y-%m-%dT%H:%M:%S', 'now') WHERE id = NEW.id;
+        END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS projects_touch_update
+        AFTER UPDATE ON projects
+        WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE projects SET updated_at = strftime('%Y-%m-%dT%H:%M:%S', 'now') WHERE id = NEW.id;
+        END
+        """
+    )
+    c.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS project_changes_prune
+        AFTER INSERT ON project_changes
+        WHEN NEW.id % 1000 = 0
+        BEGIN
+            DELETE FROM project_changes WHERE id <= NEW.id - {PROJECT_CHANGES_KEEP};
+        END
+        """
+    )
+    conn.commit()
+
+    # Queue for long-running admin operations (see job_queue.py).
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            total INTEGER,
+            done INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL
+        )
+        """
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
     conn.commit()
-    conn.close()
 
 
 def insert_project(
@@ -42,7 +218,7 @@ def insert_project(
     expiry_enabled=True,
     expiry_days=150,
 ):
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
     now = datetime.utcnow()
     expires_text = None
@@ -52,8 +228,9 @@ def insert_project(
 
     c.execute("""
         INSERT INTO projects 
-        (name, roll, project_title, project_description, website_link, video_link, qr_path, created_at, expires_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        (name, roll, project_title, project_description, website_link, video_link, qr_path, created_at, expires_at,
+         roll_key, title_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         name,
         roll,
@@ -64,35 +241,158 @@ def insert_project(
         qr_path,
         now.isoformat(timespec="seconds"),
         expires_text,
+        identity_key(roll),
+        identity_key(title),
     ))
 
     project_id = c.lastrowid
     conn.commit()
-    conn.close()
     return project_id
 
 
+def upsert_project(
+    name,
+    roll,
+    title,
+    description,
+    link,
+    video,
+    expiry_enabled=True,
+    expiry_days=150,
+):
+    """Insert a project, or update the one with the same roll + title.
+
+    A single ``INSERT ... ON CONFLICT DO UPDATE`` on the unique identity index,
+    so concurrent registrations of the same project cannot create duplicates.
+    ``qr_path`` and ``created_at`` of an existing row are kept.  Returns
+    ``(id, qr_path)``, the path being ``''`` for a new project.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    now = datetime.utcnow()
+    c.execute(
+        """
+        INSERT INTO projects
+        (name, roll, project_title, project_description, website_link, video_link, qr_path, created_at, expires_at,
+         roll_key, title_key)
+        VALUES (?, ?, ?, ?, ?, ?, '', ?, ?, ?, ?)
+        ON CONFLICT (roll_key, title_key) DO UPDATE SET
+            name = excluded.name,
+            roll = excluded.roll,
+            project_title = excluded.project_title,
+            project_description = excluded.project_description,
+            website_link = excluded.website_link,
+            video_link = excluded.video_link,
+            expires_at = excluded.expires_at
+        RETURNING id, qr_path
+        """,
+        (
+            name,
+            roll,
+            title,
+            description,
+            link,
+            video,
+            now.isoformat(timespec="seconds"),
+            expiry_text_from_now(expiry_enabled, expiry_days),
+            identity_key(roll),
+            identity_key(title),
+        ),
+    )
+    project_id, qr_path = c.fetchone()
+    conn.commit()
+    return project_id, qr_path or ""
+
+
+def upsert_projects(rows, expiry_enabled=True, expiry_days=150, lookup_chunk=400):
+    """Bulk version of :func:`upsert_project` for imports.
+
+    *rows* are dicts with ``name``, ``roll``, ``project_title``,
+    ``project_description`` and ``video_link``.  All upserts run through one
+    ``executemany`` in a single transaction; the assigned ids and current
+    ``qr_path`` values are then read back through the identity index and
+    returned as ``(id, qr_path)`` pairs in input order.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+
+    conn = get_connection()
+    c = conn.cursor()
+    now_text = datetime.utcnow().isoformat(timespec="seconds")
+    expires_text = expiry_text_from_now(expiry_enabled, expiry_days)
+    keys = [(identity_key(row["roll"]), identity_key(row["project_title"])) for row in rows]
+    c.executemany(
+        """
+        INSERT INTO projects
+        (name, roll, project_title, project_description, website_link, video_link, qr_path, created_at, expires_at,
+         roll_key, title_key)
+        VALUES (?, ?, ?, ?, ?, ?, '', ?, ?, ?, ?)
+        ON CONFLICT (roll_key, title_key) DO UPDATE SET
+            name = excluded.name,
+            roll = excluded.roll,
+            project_title = excluded.project_title,
+            project_description = excluded.project_description,
+            website_link = excluded.website_link,
+            video_link = excluded.video_link,
+            expires_at = excluded.expires_at
+        """,
+        [
+            (
+                row["name"],
+                row["roll"],
+                row["project_title"],
+                row["project_description"],
+                row.get("video_link", ""),
+                row.get("video_link", ""),
+                now_text,
+                expires_text,
+                roll_key,
+                title_key,
+            )
+            for row, (roll_key, title_key) in zip(rows, keys)
+        ],
+    )
+
+    projects_by_key = {}
+    unique_keys = list(dict.fromkeys(keys))
+    for start in range(0, len(unique_keys), lookup_chunk):
+        chunk = unique_keys[start:start + lookup_chunk]
+        placeholders = ", ".join(["(?, ?)"] * len(chunk))
+        c.execute(
+            f"""
+            SELECT id, qr_path, roll_key, title_key
+            FROM projects
+            WHERE (roll_key, title_key) IN (VALUES {placeholders})
+            """,
+            [part for key in chunk for part in key],
+        )
+        for project_id, qr_path, roll_key, title_key in c.fetchall():
+            projects_by_key[(roll_key, title_key)] = (project_id, qr_path or "")
+    conn.commit()
+    return [projects_by_key[key] for key in keys]
+
+
 def find_existing_project_id(roll, title):
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
     c.execute(
         """
         SELECT id
         FROM projects
-        WHERE lower(trim(roll)) = lower(trim(?))
-          AND lower(trim(project_title)) = lower(trim(?))
+        WHERE roll_key = ?
+          AND title_key = ?
         ORDER BY id ASC
         LIMIT 1
         """,
-        (roll, title),
+        (identity_key(roll), identity_key(title)),
     )
     row = c.fetchone()
-    conn.close()
     return row[0] if row else None
 
 
 def update_project(project_id, name, roll, title, description, link, video):
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
     c.execute(
         """
@@ -103,17 +403,18 @@ def update_project(project_id, name, roll, title, description, link, video):
             project_title = ?,
             project_description = ?,
             website_link = ?,
-            video_link = ?
+            video_link = ?,
+            roll_key = ?,
+            title_key = ?
         WHERE id = ?
         """,
-        (name, roll, title, description, link, video, project_id),
+        (name, roll, title, description, link, video, identity_key(roll), identity_key(title), project_id),
     )
     conn.commit()
-    conn.close()
 
 
 def deduplicate_projects():
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
     c.execute(
         """
@@ -133,7 +434,7 @@ def deduplicate_projects():
 
     groups = {}
     for row in rows:
-        key = ((row[2] or "").strip().lower(), (row[3] or "").strip().lower())
+        key = (identity_key(row[2]), identity_key(row[3]))
         groups.setdefault(key, []).append(row)
 
     removed_count = 0
@@ -145,6 +446,9 @@ def deduplicate_projects():
         keeper = group_rows[0]
         keeper_id = keeper[0]
 
+        duplicate_ids = [row[0] for row in group_rows[1:]]
+        c.executemany("DELETE FROM projects WHERE id = ?", [(pid,) for pid in duplicate_ids])
+
         def latest_non_empty(index):
             for candidate in reversed(group_rows):
                 value = candidate[index]
@@ -161,7 +465,9 @@ def deduplicate_projects():
                 project_title = ?,
                 project_description = ?,
                 website_link = ?,
-                video_link = ?
+                video_link = ?,
+                roll_key = ?,
+                title_key = ?
             WHERE id = ?
             """,
             (
@@ -171,22 +477,48 @@ def deduplicate_projects():
                 latest_non_empty(4),
                 latest_non_empty(5),
                 latest_non_empty(6),
+                identity_key(latest_non_empty(2)),
+                identity_key(latest_non_empty(3)),
                 keeper_id,
             ),
         )
-
-        duplicate_ids = [row[0] for row in group_rows[1:]]
-        c.executemany("DELETE FROM projects WHERE id = ?", [(pid,) for pid in duplicate_ids])
         removed_count += len(duplicate_ids)
         deduped_groups += 1
 
     conn.commit()
-    conn.close()
     return removed_count, deduped_groups
 
 
+def get_project_changes(since_id):
+    """Return ``(latest_id, project_ids)`` for changes after *since_id*.
+
+    *project_ids* is ``None`` when entries after *since_id* were already
+    pruned, meaning the caller must treat everything as changed.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("SELECT COALESCE(MAX(id), 0), COALESCE(MIN(id), 0) FROM project_changes")
+    latest_id, oldest_id = c.fetchone()
+    if latest_id <= since_id:
+        return latest_id, set()
+    if oldest_id > since_id + 1:
+        return latest_id, None
+    c.execute(
+        "SELECT DISTINCT project_id FROM project_changes WHERE id > ? AND id <= ?",
+        (since_id, latest_id),
+    )
+    return latest_id, {row[0] for row in c.fetchall()}
+
+
+def get_latest_change_id():
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("SELECT COALESCE(MAX(id), 0) FROM project_changes")
+    return c.fetchone()[0]
+
+
 def get_all_projects():
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
 
     c.execute(
@@ -201,24 +533,297 @@ def get_all_projects():
             video_link,
             qr_path,
             created_at,
-            expires_at
+            expires_at,
+            qr_render_hash
         FROM projects
         """
     )
     data = c.fetchall()
 
-    conn.close()
     return data
 
 
+def get_projects_grid_page(page, page_size):
+    """Return ``(rows, total)`` for 1-based *page* of projects ordered by id.
+
+    Rows have the same columns as :func:`get_all_projects`.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM projects")
+    total = c.fetchone()[0]
+    c.execute(
+        """
+        SELECT
+            id,
+            name,
+            roll,
+            project_title,
+            project_description,
+            website_link,
+            video_link,
+            qr_path,
+            created_at,
+            expires_at,
+            qr_render_hash
+        FROM projects
+        ORDER BY id
+        LIMIT ? OFFSET ?
+        """,
+        (page_size, (max(1, page) - 1) * page_size),
+    )
+    return c.fetchall(), total
+
+
+def get_video_reference_counts():
+    """Map uploaded video file names to the number of projects linking them."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(
+        """
+        SELECT video_link, COUNT(*)
+        FROM projects
+        WHERE video_link LIKE '%/uploaded_videos/%'
+        GROUP BY video_link
+        """
+    )
+    counts = {}
+    for video_link, count in c.fetchall():
+        file_name = video_link.rsplit("/uploaded_videos/", 1)[1]
+        counts[file_name] = counts.get(file_name, 0) + count
+    return counts
+
+
+def expiry_text_from_now(expiry_enabled=True, expiry_days=150):
+    if not expiry_enabled:
+        return None
+    return (datetime.utcnow() + timedelta(days=max(1, int(expiry_days)))).isoformat(
+        timespec="seconds"
+    )
+
+
 def set_project_expiry(project_id, expiry_enabled=True, expiry_days=150):
-    conn = sqlite3.connect("expo.db")
+    conn = get_connection()
     c = conn.cursor()
-    expires_text = None
-    if expiry_enabled:
-        expires_text = (datetime.utcnow() + timedelta(days=max(1, int(expiry_days)))).isoformat(
-            timespec="seconds"
-        )
+    expires_text = expiry_text_from_now(expiry_enabled, expiry_days)
     c.execute("UPDATE projects SET expires_at = ? WHERE id = ?", (expires_text, project_id))
     conn.commit()
-    conn.close()
+
+
+def apply_expiry_to_all(expiry_enabled=True, expiry_days=150):
+    """Set ``expires_at`` for every project in one statement; returns the row count."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("UPDATE projects SET expires_at = ?", (expiry_text_from_now(expiry_enabled, expiry_days),))
+    conn.commit()
+    return c.rowcount
+
+
+def _utc_now_text():
+    return datetime.utcnow().isoformat(timespec="seconds")
+
+
+def count_expired_projects():
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(
+        "SELECT COUNT(*) FROM projects WHERE expires_at IS NOT NULL AND expires_at <= ?",
+        (_utc_now_text(),),
+    )
+    return c.fetchone()[0]
+
+
+def sweep_expired(archive=True, batch_size=500):
+    """Remove expired projects, *batch_size* rows per transaction.
+
+    With *archive* the rows are copied to ``projects_archive`` first.  Yields
+    the ``(id, qr_path, video_link)`` rows of each committed batch so the
+    caller can delete their files.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    now_text = _utc_now_text()
+    while True:
+        c.execute(
+            """
+            SELECT id, qr_path, video_link
+            FROM projects
+            WHERE expires_at IS NOT NULL AND expires_at <= ?
+            ORDER BY expires_at
+            LIMIT ?
+            """,
+            (now_text, batch_size),
+        )
+        batch = c.fetchall()
+        if not batch:
+            return
+        ids = [(row[0],) for row in batch]
+        if archive:
+            c.executemany(
+                """
+                INSERT OR REPLACE INTO projects_archive (
+                    id, name, roll, project_title, project_description, website_link,
+                    video_link, qr_path, created_at, expires_at, archived_at
+                )
+                SELECT
+                    id, name, roll, project_title, project_description, website_link,
+                    video_link, qr_path, created_at, expires_at, ?
+                FROM projects
+                WHERE id = ?
+                """,
+                [(now_text, row_id) for (row_id,) in ids],
+            )
+        c.executemany("DELETE FROM projects WHERE id = ?", ids)
+        conn.commit()
+        yield batch
+
+
+def set_qr_paths(path_updates, expiry_enabled=None, expiry_days=150, render_hashes=None):
+    """Store many ``(project_id, qr_path)`` pairs in a single transaction.
+
+    When *expiry_enabled* is given, ``expires_at`` is refreshed for the same
+    rows, matching what a per-row ``set_qr_path`` + ``set_project_expiry``
+    would have written.  *render_hashes* maps project ids to the render hash
+    stored alongside the path.
+    """
+    path_updates = list(path_updates)
+    if not path_updates:
+        return 0
+    render_hashes = render_hashes or {}
+
+    conn = get_connection()
+    c = conn.cursor()
+    if expiry_enabled is None:
+        c.executemany(
+            "UPDATE projects SET qr_path = ?, qr_render_hash = ? WHERE id = ?",
+            [
+                (qr_path, render_hashes.get(project_id), project_id)
+                for project_id, qr_path in path_updates
+            ],
+        )
+    else:
+        expires_text = expiry_text_from_now(expiry_enabled, expiry_days)
+        c.executemany(
+            "UPDATE projects SET qr_path = ?, qr_render_hash = ?, expires_at = ? WHERE id = ?",
+            [
+                (qr_path, render_hashes.get(project_id), expires_text, project_id)
+                for project_id, qr_path in path_updates
+            ],
+        )
+    conn.commit()
+    return len(path_updates)
+
+
+JOB_COLUMNS = (
+    "id",
+    "kind",
+    "params",
+    "status",
+    "total",
+    "done",
+    "message",
+    "cancel_requested",
+    "created_at",
+    "started_at",
+    "heartbeat_at",
+    "finished_at",
+)
+
+
+def _job_from_row(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    job["params"] = json.loads(job["params"])
+    return job
+
+
+def create_job(kind, params, total=None):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO jobs (kind, params, total, created_at) VALUES (?, ?, ?, ?)",
+        (kind, json.dumps(params), total, time.time()),
+    )
+    conn.commit()
+    return c.lastrowid
+
+
+def claim_next_job(stale_after=300):
+    """Mark the oldest queued job running and return it, or ``None``.
+
+    Running jobs without a heartbeat for *stale_after* seconds belonged to a
+    process that died; they are queued again first.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    now = time.time()
+    c.execute(
+        "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND heartbeat_at < ?",
+        (now - stale_after,),
+    )
+    c.execute(
+        f"""
+        UPDATE jobs
+        SET status = 'running', started_at = COALESCE(started_at, ?), heartbeat_at = ?
+        WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1)
+        RETURNING {", ".join(JOB_COLUMNS)}
+        """,
+        (now, now),
+    )
+    row = c.fetchone()
+    conn.commit()
+    return _job_from_row(row) if row else None
+
+
+def update_job_progress(job_id, done, total=None):
+    """Record progress and return ``True`` when cancellation was requested."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(
+        """
+        UPDATE jobs
+        SET done = ?, total = COALESCE(?, total), heartbeat_at = ?
+        WHERE id = ?
+        RETURNING cancel_requested
+        """,
+        (done, total, time.time(), job_id),
+    )
+    row = c.fetchone()
+    conn.commit()
+    return bool(row and row[0])
+
+
+def finish_job(job_id, status, message=""):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(
+        "UPDATE jobs SET status = ?, message = ?, finished_at = ? WHERE id = ?",
+        (status, message, time.time(), job_id),
+    )
+    conn.commit()
+
+
+def request_job_cancel(job_id):
+    """Cancel a queued job immediately, or flag a running one to stop.
+
+    Returns ``True`` when the job was still queued and is now cancelled.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(
+        """
+        UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?
+        WHERE id = ? AND status = 'queued'
+        """,
+        (time.time(), job_id),
+    )
+    cancelled = c.rowcount > 0
+    c.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+    conn.commit()
+    return cancelled
+
+
+def get_recent_jobs(limit=10):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+    return [_job_from_row(row) for row in c.fetchall()]
@@ -0,0 +1,89 @@
+"""Background runner for long-running admin operations.
+
+Jobs live in the ``jobs`` table, so they outlive Streamlit reruns, browser
+refreshes and (after a restart) the process itself.  One daemon thread per
+process claims queued jobs and runs the handler registered for their kind.
+Handlers receive the job's params and a ``progress(done, total=None)``
+callback, which records progress and raises :class:`JobCancelled` once a
+cancel was requested.
+"""
+
+import threading
+import time
+import traceback
+
+from database import claim_next_job, create_job, finish_job, update_job_progress
+
+
+JOB_POLL_INTERVAL = 2.0
+
+_handlers = {}
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = {"thread": None}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def register_handler(kind, handler):
+    """Register (or replace) the handler run for jobs of *kind*.
+
+    Handlers return a short result message for the status panel.
+    """
+    _handlers[kind] = handler
+
+
+def submit_job(kind, params, total=None):
+    job_id = create_job(kind, params, total=total)
+    ensure_worker()
+    _wakeup.set()
+    return job_id
+
+
+def _run_job(job):
+    handler = _handlers.get(job["kind"])
+    if handler is None:
+        finish_job(job["id"], "failed", f"No handler for job kind {job['kind']!r}.")
+        return
+
+    def progress(done, total=None):
+        if update_job_progress(job["id"], done, total):
+            raise JobCancelled()
+
+    try:
+        progress(0)
+        message = handler(job["params"], progress)
+    except JobCancelled:
+        finish_job(job["id"], "cancelled", "Cancelled.")
+    except Exception as exc:
+        traceback.print_exc()
+        finish_job(job["id"], "failed", str(exc))
+    else:
+        finish_job(job["id"], "done", message or "")
+
+
+def _work_loop():
+    while True:
+        try:
+            job = claim_next_job()
+        except Exception:
+            traceback.print_exc()
+            time.sleep(JOB_POLL_INTERVAL)
+            continue
+        if job is None:
+            _wakeup.wait(JOB_POLL_INTERVAL)
+            _wakeup.clear()
+            continue
+        _run_job(job)
+
+
+def ensure_worker():
+    """Start this process's worker thread if it is not running yet."""
+    with _lock:
+        thread = _worker["thread"]
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_work_loop, name="expo-job-worker", daemon=True)
+            thread.start()
+            _worker["thread"] = thread
@@ -0,0 +1,238 @@
+"""LAN address detection for QR base URLs.
+
+The address of the default-route interface is preferred (``/proc/net/route``,
+else a connected UDP socket, which needs a route but sends nothing).  Only
+when there is no route are the interfaces enumerated (psutil when installed,
+else ``SIOCGIFADDR`` on Linux, else the host name), skipping virtual bridges
+such as ``virbr0`` or ``vboxnet0``.  Results are cached for
+``LAN_IP_CACHE_TTL`` seconds, and a newly detected address only replaces the
+current one after it has been seen for ``LAN_IP_STABLE_SECONDS``, so a
+flapping interface does not trigger a full QR regeneration.
+"""
+
+import ipaddress
+import os
+import socket
+import struct
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+LAN_IP_CACHE_TTL = float(os.getenv("EXPO_LAN_IP_TTL", "30"))
+LAN_IP_STABLE_SECONDS = float(os.getenv("EXPO_LAN_IP_STABLE_SECONDS", "60"))
+SIOCGIFADDR = 0x8915
+ROUTE_TABLE = "/proc/net/route"
+RTF_UP = 0x1
+# Host-only / container bridges that are never the expo LAN.
+VIRTUAL_INTERFACE_PREFIXES = (
+    "virbr",
+    "vboxnet",
+    "vmnet",
+    "docker",
+    "br-",
+    "veth",
+    "lxcbr",
+    "lxdbr",
+    "cni",
+    "flannel",
+)
+
+_lock = threading.Lock()
+_state = {
+    "addresses": None,
+    "route_address": None,
+    "checked_at": 0.0,
+    "current": None,
+    "pending": None,
+    "pending_since": 0.0,
+}
+
+
+def _is_virtual_interface(name):
+    return name.startswith(VIRTUAL_INTERFACE_PREFIXES)
+
+
+def _default_route_interfaces():
+    """Interfaces holding a default route, lowest metric first."""
+    try:
+        with open(ROUTE_TABLE, "r", encoding="ascii") as file_obj:
+            lines = file_obj.read().splitlines()[1:]
+    except OSError:
+        return []
+    routes = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 7 or fields[1] != "00000000":
+            continue
+        try:
+            flags = int(fields[3], 16)
+            metric = int(fields[6])
+        except ValueError:
+            continue
+        if flags & RTF_UP:
+            routes.append((metric, fields[0]))
+    return [name for _, name in sorted(routes)]
+
+
+def _interface_address(name):
+    if psutil is not None:
+        for address in psutil.net_if_addrs().get(name, []):
+            if address.family == socket.AF_INET:
+                return address.address
+        return None
+    if fcntl is None:
+        return None
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        request = struct.pack("256s", name.encode("utf-8")[:15])
+        return socket.inet_ntoa(fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)[20:24])
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def _connected_socket_address():
+    # connect() on UDP only picks a route and source address; nothing is sent.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("8.8.8.8", 80))
+        return sock.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def default_route_ipv4():
+    """Source address of the default route, or ``None`` without one."""
+    address = None
+    for interface in _default_route_interfaces():
+        address = _interface_address(interface)
+        if address is not None:
+            break
+    if address is None:
+        address = _connected_socket_address()
+    if address is None or ipaddress.ip_address(address).is_loopback:
+        return None
+    return address
+
+
+def _psutil_addresses():
+    addresses = []
+    for name, interface_addresses in psutil.net_if_addrs().items():
+        if _is_virtual_interface(name):
+            continue
+        for address in interface_addresses:
+            if address.family == socket.AF_INET:
+                addresses.append(address.address)
+    return addresses
+
+
+def _ioctl_addresses():
+    addresses = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _, name in socket.if_nameindex():
+            if _is_virtual_interface(name):
+                continue
+            request = struct.pack("256s", name.encode("utf-8")[:15])
+            try:
+                response = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+            except OSError:
+                continue
+            addresses.append(socket.inet_ntoa(response[20:24]))
+    finally:
+        sock.close()
+    return addresses
+
+
+def _hostname_addresses():
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+    except OSError:
+        return []
+    return [info[4][0] for info in infos]
+
+
+def list_interface_ipv4s():
+    """Return the usable (non-loopback, non-link-local) IPv4 addresses of this host."""
+    sources = []
+    if psutil is not None:
+        sources.append(_psutil_addresses)
+    if fcntl is not None and hasattr(socket, "if_nameindex"):
+        sources.append(_ioctl_addresses)
+    sources.append(_hostname_addresses)
+
+    for source in sources:
+        try:
+            found = source()
+        except OSError:
+            continue
+        addresses = []
+        for address in found:
+            parsed = ipaddress.ip_address(address)
+            if parsed.is_loopback or parsed.is_link_local or parsed.is_unspecified:
+                continue
+            if address not in addresses:
+                addresses.append(address)
+        if addresses:
+            return addresses
+    return []
+
+
+def _preference(address):
+    parsed = ipaddress.ip_address(address)
+    if parsed in ipaddress.ip_network("192.168.0.0/16"):
+        return 0
+    if parsed in ipaddress.ip_network("10.0.0.0/8"):
+        return 1
+    if parsed in ipaddress.ip_network("172.16.0.0/12"):
+        return 2
+    return 3
+
+
+def _refresh_addresses(now):
+    if _state["addresses"] is None or now - _state["checked_at"] >= LAN_IP_CACHE_TTL:
+        _state["route_address"] = default_route_ipv4()
+        _state["addresses"] = [] if _state["route_address"] else list_interface_ipv4s()
+        _state["checked_at"] = now
+
+
+def detect_lan_ip():
+    """Return the LAN IPv4 address to put in QR URLs (``127.0.0.1`` if none)."""
+    with _lock:
+        now = time.monotonic()
+        _refresh_addresses(now)
+        addresses = _state["addresses"]
+        current = _state["current"]
+        if _state["route_address"]:
+            candidate = _state["route_address"]
+        elif current in addresses:
+            candidate = current
+        elif addresses:
+            candidate = min(addresses, key=_preference)
+        else:
+            candidate = "127.0.0.1"
+
+        if current is None or candidate == current:
+            _state["current"] = candidate
+            _state["pending"] = None
+        elif candidate != _state["pending"]:
+            _state["pending"] = candidate
+            _state["pending_since"] = now
+        elif now - _state["pending_since"] >= LAN_IP_STABLE_SECONDS:
+            _state["current"] = candidate
+            _state["pending"] = None
+        return _state["current"]
+
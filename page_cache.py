@@ -0,0 +1,138 @@
+"""In-process LRU cache of rendered project detail pages for web_app.
+
+Entries are keyed by ``(project_id, settings_version, origin)``.  Before each
+lookup the ``project_changes`` feed in the database is polled, so a write to a
+project from any process (Streamlit, bulk import, dedupe, expiry updates)
+drops only that project's pages.  A settings change alters the key and clears
+the cache.  Each entry lives at most ``PAGE_CACHE_TTL`` seconds and never past
+the project's ``expires_at``.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from database import get_latest_change_id, get_project_changes
+
+
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("EXPO_PAGE_CACHE_ENTRIES", "2000"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("EXPO_PAGE_CACHE_BYTES", str(32 * 1024 * 1024)))
+PAGE_CACHE_TTL = float(os.getenv("EXPO_PAGE_CACHE_TTL", "600"))
+
+
+def expiry_deadline(expires_at_text):
+    """Translate a UTC ``expires_at`` string into a ``time.time()`` deadline."""
+    if not expires_at_text:
+        return None
+    try:
+        expires_at = datetime.fromisoformat(expires_at_text)
+    except ValueError:
+        return None
+    return time.time() + (expires_at - datetime.utcnow()).total_seconds()
+
+
+class RenderedPageCache:
+    def __init__(self, max_entries=PAGE_CACHE_MAX_ENTRIES, max_bytes=PAGE_CACHE_MAX_BYTES, ttl=PAGE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._settings_version = None
+        self._change_id = None
+
+    def _sync(self, settings_version):
+        if self._change_id is None:
+            self._change_id = get_latest_change_id()
+        else:
+            latest_id, changed_ids = get_project_changes(self._change_id)
+            self._change_id = latest_id
+            if changed_ids is None:
+                self._clear()
+            elif changed_ids:
+                self._invalidate(changed_ids)
+        if settings_version != self._settings_version:
+            self._clear()
+            self._settings_version = settings_version
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry["body"])
+
+    def get(self, project_id, settings_version, origin):
+        """Return ``(entry, change_id)``.
+
+        *entry* is the cached dict (``body``, ``etag``, ``last_modified``) or
+        ``None``.  *change_id* is the change-feed position the cache was synced
+        to; pass it to :meth:`put` with a page rendered after this call.
+        """
+        with self._lock:
+            self._sync(settings_version)
+            change_id = self._change_id
+            key = (project_id, settings_version, origin)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, change_id
+            if time.time() >= entry["deadline"]:
+                self._drop(key)
+                return None, change_id
+            self._entries.move_to_end(key)
+            return entry, change_id
+
+    def put(
+        self,
+        project_id,
+        settings_version,
+        origin,
+        body,
+        expires_at_text=None,
+        etag=None,
+        last_modified=None,
+        change_id=None,
+    ):
+        """Cache a page rendered from data read after ``get()`` returned *change_id*.
+
+        The page is dropped when the project was written since *change_id*:
+        another request may already have synced past that write, so it would
+        never be invalidated.
+        """
+        deadline = time.time() + self.ttl
+        project_deadline = expiry_deadline(expires_at_text)
+        if project_deadline is not None:
+            deadline = min(deadline, project_deadline)
+        if deadline <= time.time() or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if settings_version != self._settings_version:
+                return
+            if change_id is not None:
+                _, changed_ids = get_project_changes(change_id)
+                if changed_ids is None or project_id in changed_ids:
+                    return
+            key = (project_id, settings_version, origin)
+            self._drop(key)
+            self._entries[key] = {
+                "body": body,
+                "deadline": deadline,
+                "etag": etag,
+                "last_modified": last_modified,
+            }
+            self._bytes += len(body)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, old_entry = self._entries.popitem(last=False)
+                self._bytes -= len(old_entry["body"])
+
+    def _invalidate(self, project_ids):
+        project_ids = set(project_ids)
+        for key in [key for key in self._entries if key[0] in project_ids]:
+            self._drop(key)
@@ -1,8 +1,15 @@
+import hashlib
 import json
 import os
+import threading
+import time
+import uuid
 
 
 SETTINGS_FILE = "app_settings.json"
+# How long a cached copy is trusted before the file is stat'ed again, so
+# changes from another process show up within this delay.
+SETTINGS_CHECK_INTERVAL = 2.0
 
 
 DEFAULT_SETTINGS = {
@@ -14,15 +21,38 @@ DEFAULT_SETTINGS = {
     "last_qr_base_url": "",
     "expiry_enabled": True,
     "expiry_days": 150,
+    "max_video_upload_mb": 200,
     "video_fit": "contain",
     "font_scale": 1.0,
     "spacing_scale": 1.0,
     "grid_columns": 6,
+    "grid_page_size": 48,
+    "list_page_size": 24,
     "qr_payload_mode": "url_only",
+    "qr_output_format": "png",
+    "qr_png_mode": "palette",
+    "qr_png_compress_level": 6,
+    "qr_png_optimize": False,
 }
 
+_lock = threading.Lock()
+_cache = {"settings": None, "stamp": None, "checked_at": 0.0, "version": ""}
 
-def load_settings():
+
+def _file_stamp():
+    try:
+        stat = os.stat(SETTINGS_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _version_of(settings):
+    blob = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def _read_settings_file():
     settings = DEFAULT_SETTINGS.copy()
     if os.path.exists(SETTINGS_FILE):
         try:
@@ -36,9 +66,68 @@ def load_settings():
     return settings
 
 
+def _remember(settings, stamp):
+    _cache["settings"] = settings
+    _cache["stamp"] = stamp
+    _cache["checked_at"] = time.monotonic()
+    _cache["version"] = _version_of(settings)
+
+
+def _refresh():
+    now = time.monotonic()
+    if _cache["settings"] is not None and now - _cache["checked_at"] < SETTINGS_CHECK_INTERVAL:
+        return
+    stamp = _file_stamp()
+    if _cache["settings"] is not None and stamp == _cache["stamp"]:
+        _cache["checked_at"] = now
+        return
+    _remember(_read_settings_file(), stamp)
+
+
+def load_settings():
+    """Return a copy of the current settings.
+
+    The parsed file is cached in-process and only re-validated (by mtime and
+    size) every ``SETTINGS_CHECK_INTERVAL`` seconds.
+    """
+    with _lock:
+        _refresh()
+        return dict(_cache["settings"])
+
+
+def settings_version():
+    """Short content hash of the current settings, identical across processes."""
+    with _lock:
+        _refresh()
+        return _cache["version"]
+
+
+def settings_modified_at():
+    """Modification time (epoch seconds) of the settings file, or ``None``."""
+    with _lock:
+        _refresh()
+        stamp = _cache["stamp"]
+    return None if stamp is None else stamp[0] / 1e9
+
+
 def save_settings(settings):
     merged = DEFAULT_SETTINGS.copy()
     merged.update(settings or {})
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as file_obj:
-        json.dump(merged, file_obj, indent=2)
+    directory = os.path.dirname(os.path.abspath(SETTINGS_FILE))
+    tmp_path = os.path.join(directory, f".app_settings.{uuid.uuid4().hex}.tmp")
+    # Not mkstemp: its 0600 mode would survive the rename and hide the
+    # settings from a web process running as another user.
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file_obj:
+            json.dump(merged, file_obj, indent=2)
+            file_obj.flush()
+            os.fsync(file_obj.fileno())
+        os.replace(tmp_path, SETTINGS_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    with _lock:
+        _remember(dict(merged), _file_stamp())
     return merged
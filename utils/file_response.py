@@ -0,0 +1,96 @@
+"""Byte-range file responses for large media served by the Flask app.
+
+Video players seek with ``Range`` requests.  Open-ended ranges (``bytes=N-``)
+and whole files are handed to the server's ``wsgi.file_wrapper`` with the file
+already positioned, so gunicorn can ``sendfile`` them without copying through
+Python.  Bounded ranges are streamed in fixed-size blocks.
+"""
+
+import mimetypes
+import os
+from datetime import datetime, timezone
+
+from flask import Response
+from werkzeug.http import parse_range_header
+
+
+BLOCK_SIZE = 256 * 1024
+
+
+def file_etag(stat_result):
+    return f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+
+
+def _iter_file_range(file_obj, length, block_size=BLOCK_SIZE):
+    try:
+        remaining = length
+        while remaining > 0:
+            chunk = file_obj.read(min(block_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def ranged_file_response(request, path, max_age=86400, immutable=False):
+    """Serve *path* with ``Accept-Ranges``, 206/416 handling and ETag checks.
+
+    The caller is responsible for resolving *path* safely inside its directory.
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    last_modified = datetime.fromtimestamp(int(stat_result.st_mtime), tz=timezone.utc)
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    def with_validators(response):
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers["Accept-Ranges"] = "bytes"
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        if immutable:
+            response.cache_control.immutable = True
+        return response
+
+    if request.if_none_match.contains(etag):
+        return with_validators(Response(status=304))
+    if_modified_since = request.if_modified_since
+    if not request.if_none_match and if_modified_since and last_modified <= if_modified_since:
+        return with_validators(Response(status=304))
+
+    start, stop, status = 0, size, 200
+    range_header = request.headers.get("Range")
+    if range_header:
+        if_range = request.if_range
+        if if_range.etag is None and if_range.date is None:
+            range_applies = True
+        else:
+            range_applies = if_range.etag == etag
+        parsed = parse_range_header(range_header) if range_applies else None
+        if parsed is not None and len(parsed.ranges) == 1:
+            bounds = parsed.range_for_length(size)
+            if bounds is None:
+                response = Response(status=416)
+                response.headers["Content-Range"] = f"bytes */{size}"
+                return with_validators(response)
+            start, stop = bounds
+            status = 206
+
+    length = stop - start
+    file_obj = open(path, "rb")
+    file_obj.seek(start)
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    if file_wrapper is not None and stop == size:
+        # Runs to EOF, so any file_wrapper (and gunicorn's sendfile) is exact.
+        body = file_wrapper(file_obj, BLOCK_SIZE)
+    else:
+        body = _iter_file_range(file_obj, length)
+
+    response = Response(body, status=status, mimetype=mimetype, direct_passthrough=True)
+    response.headers["Content-Length"] = str(length)
+    if status == 206:
+        response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    return with_validators(response)
@@ -0,0 +1,68 @@
+"""Parallel QR rendering for bulk regeneration.
+
+Encoding, compositing and PNG writing are CPU bound and independent per
+project, so a batch is spread across a process pool.  Database writes stay
+with the caller, which collects the results and stores them in one go.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .qr_cache import render_cache_key
+from .qr_generator import generate_qr
+from .qr_thumbnail import remove_qr_thumbnails
+
+
+def default_worker_count():
+    return max(1, os.cpu_count() or 1)
+
+
+def qr_job_hash(job):
+    """Hash of everything that determines a job's output file.
+
+    Stored per project, it lets regeneration skip rows whose payload, label,
+    file name and render settings are unchanged.
+    """
+    options = dict(job)
+    options.pop("project_id", None)
+    options.pop("previous_path", None)
+    return render_cache_key(**options)
+
+
+def render_qr_job(job):
+    """Render one job dict and return ``(project_id, qr_path)``.
+
+    A job carries ``project_id`` plus the keyword arguments of
+    :func:`generate_qr` (``data``, ``filename``, ``label``...), including
+    ``previous_path``, the project's current QR file.
+    """
+    options = dict(job)
+    project_id = options.pop("project_id")
+    qr_path = generate_qr(**options)
+    previous_path = options.get("previous_path")
+    if previous_path and os.path.normpath(previous_path) != os.path.normpath(qr_path):
+        remove_qr_thumbnails(previous_path)
+    return project_id, qr_path
+
+
+def render_qr_batch(jobs, max_workers=None):
+    """Render all *jobs* and return a list of ``(project_id, qr_path)``.
+
+    Small batches, or a pool that cannot be started, fall back to rendering
+    in the current process.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    workers = min(max_workers or default_worker_count(), len(jobs))
+    if workers <= 1:
+        return [render_qr_job(job) for job in jobs]
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(render_qr_job, jobs, chunksize=chunksize))
+    except (BrokenProcessPool, OSError):
+        return [render_qr_job(job) for job in jobs]
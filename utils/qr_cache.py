@@ -0,0 +1,208 @@
+"""Content-addressed cache for rendered QR images.
+
+Every render is keyed on a hash of all of its inputs.  Cached files live in
+``qr_cache/`` and are handed out to ``qr_codes/`` as hardlinks (or copies when
+the filesystem does not support links), so an unchanged payload never needs
+to be encoded or rasterized again.  A small SQLite index tracks entry sizes and
+last use so the cache can be bounded by total bytes; each thread keeps one
+WAL-mode connection to it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+
+QR_CACHE_DIR = "qr_cache"
+QR_CACHE_INDEX = os.path.join(QR_CACHE_DIR, "index.db")
+QR_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# last_used is an LRU hint; refreshing it at most this often keeps lookups read-only.
+LAST_USED_RESOLUTION = 60.0
+
+# Bump when the renderer output changes so stale entries are not reused.
+RENDER_VERSION = 1
+
+
+def render_cache_key(**render_inputs):
+    blob = json.dumps(
+        {"render_version": RENDER_VERSION, **render_inputs},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def cache_path_for(key, ext=".png"):
+    return os.path.join(QR_CACHE_DIR, key[:2], f"{key}{ext}")
+
+
+_local = threading.local()
+
+
+def _open_index():
+    os.makedirs(QR_CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(QR_CACHE_INDEX, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # One writer sets up the schema and the size counter at a time.
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)")
+    # Running total of entry sizes, kept by triggers so eviction checks read
+    # one row instead of summing the whole index.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_size INTEGER NOT NULL
+        )
+        """
+    )
+    for event, delta in (
+        ("INSERT", "NEW.size"),
+        ("DELETE", "-OLD.size"),
+        ("UPDATE OF size", "NEW.size - OLD.size"),
+    ):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS entries_total_{event.split()[0].lower()}
+            AFTER {event} ON entries
+            BEGIN
+                UPDATE stats SET total_size = total_size + {delta} WHERE id = 1;
+            END
+            """
+        )
+    if conn.execute("SELECT 1 FROM stats WHERE id = 1").fetchone() is None:
+        conn.execute("INSERT INTO stats (id, total_size) SELECT 1, COALESCE(SUM(size), 0) FROM entries")
+    conn.commit()
+    return conn
+
+
+def _index():
+    """This thread's connection to the cache index (reopened after fork)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid() or _local.path != QR_CACHE_INDEX:
+        conn = _open_index()
+        _local.conn = conn
+        _local.pid = os.getpid()
+        _local.path = QR_CACHE_INDEX
+    return conn
+
+
+def lookup(key):
+    """Return the cached file path for *key*, or ``None`` on a miss.
+
+    ``last_used`` is only rewritten when it is older than
+    ``LAST_USED_RESOLUTION`` seconds, so hot entries cost no write.
+    """
+    if not os.path.exists(QR_CACHE_INDEX):
+        return None
+    conn = _index()
+    row = conn.execute("SELECT path, last_used FROM entries WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    path, last_used = row
+    if not os.path.exists(path):
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        conn.commit()
+        return None
+    now = time.time()
+    if now - last_used >= LAST_USED_RESOLUTION:
+        conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+        conn.commit()
+    return path
+
+
+def store(key, path, max_bytes=QR_CACHE_MAX_BYTES):
+    """Register a freshly written cache file and evict old entries if needed."""
+    conn = _index()
+    conn.execute(
+        """
+        INSERT INTO entries (key, path, size, last_used) VALUES (?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            path = excluded.path,
+            size = excluded.size,
+            last_used = excluded.last_used
+        """,
+        (key, path, os.path.getsize(path), time.time()),
+    )
+    conn.commit()
+    _evict(conn, max_bytes, keep=key)
+
+
+def _evict(conn, max_bytes, keep=None):
+    total = conn.execute("SELECT total_size FROM stats WHERE id = 1").fetchone()[0]
+    if total <= max_bytes:
+        return
+    evicted = []
+    for key, path, size in conn.execute("SELECT key, path, size FROM entries ORDER BY last_used ASC"):
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        evicted.append((key,))
+        total -= size
+    conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+    conn.commit()
+
+
+def write_atomic(path, writer):
+    """Call ``writer(tmp_path)`` and move the result to *path* atomically.
+
+    The temp file is unique per call, so concurrent renders of the same key
+    from threads of one process never touch each other's file.  *writer*
+    creates it, so it gets the usual umask-derived mode.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def materialize(cached_path, dest_path):
+    """Place *cached_path* at *dest_path* as a hardlink, or a copy as fallback.
+
+    The destination is always replaced rather than written through, so a
+    later in-place write can never corrupt the shared cache entry.
+    """
+    try:
+        if os.path.samefile(cached_path, dest_path):
+            return dest_path
+    except FileNotFoundError:
+        pass
+
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        try:
+            os.link(cached_path, tmp_path)
+        except OSError:
+            shutil.copyfile(cached_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return dest_path
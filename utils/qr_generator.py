@@ -1,53 +1,270 @@
 import qrcode
 from qrcode.constants import ERROR_CORRECT_M
 import os
-from PIL import Image, ImageDraw, ImageFont
+import re
+from xml.sax.saxutils import escape
+from PIL import Image, ImageDraw
 
+from . import qr_cache
+from .qr_label import draw_label, label_bbox
 
-def generate_qr(data: str, filename: str, label: str = "") -> str:
-    """Generate a QR code image from *data* and save it under *filename*.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-    The file is written to a ``qr_codes`` directory at the project root (created
-    if it doesn't exist).  The function returns the path to the saved PNG file.
+
+def rasterize_matrix(matrix, box_size):
+    """Turn a boolean module matrix (border included) into a black/white image.
+
+    Each module becomes a ``box_size`` square in one vectorized step; the result
+    is pixel-identical to qrcode's PIL image factory.  Falls back to that
+    factory's approach when NumPy is not installed.
     """
-    if not os.path.exists("qr_codes"):
-        os.makedirs("qr_codes")
+    if np is None:
+        size = len(matrix) * box_size
+        img = Image.new("L", (size, size), 255)
+        draw = ImageDraw.Draw(img)
+        for r, row in enumerate(matrix):
+            for c, dark in enumerate(row):
+                if dark:
+                    x, y = c * box_size, r * box_size
+                    draw.rectangle([x, y, x + box_size - 1, y + box_size - 1], fill=0)
+        return img
+
+    modules = np.asarray(matrix, dtype=bool)
+    pixels = np.where(modules, 0, 255).astype(np.uint8)
+    pixels = pixels.repeat(box_size, axis=0).repeat(box_size, axis=1)
+    return Image.fromarray(pixels, mode="L")
+
 
-    path = f"qr_codes/{filename}.png"
+OUTPUT_FORMATS = ("png", "svg")
+PNG_MODES = ("rgb", "1bit", "palette")
+BW_PALETTE = [255, 255, 255, 0, 0, 0]
+LABEL_PADDING = 14
+SVG_LABEL_FONT_SIZE = 14
+FINGERPRINT_LENGTH = 10
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{%d}\.(png|svg)$" % FINGERPRINT_LENGTH)
 
+
+def build_qr_matrix(data, border=5, error_correction=ERROR_CORRECT_M):
+    """Encode *data* and return the boolean module matrix, border included."""
     qr = qrcode.QRCode(
         version=None,
-        error_correction=ERROR_CORRECT_M,
-        box_size=10,
-        border=5,
+        error_correction=error_correction,
+        border=border,
     )
     qr.add_data(data)
     qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def render_qr_image(data, label="", box_size=10, border=5, error_correction=ERROR_CORRECT_M):
+    """Encode *data* and return the composed grayscale image (QR plus optional label)."""
+    qr_img = rasterize_matrix(build_qr_matrix(data, border, error_correction), box_size)
+
+    if not label:
+        return qr_img
+
+    text = label.strip()
+    left, top, right, bottom = label_bbox(text)
+    text_width = right - left
+    text_height = bottom - top
+
+    padding = LABEL_PADDING
+    extra_height = text_height + (padding * 2)
+    canvas_width = max(qr_img.width, text_width + (padding * 2))
+    canvas = Image.new("L", (canvas_width, qr_img.height + extra_height), 255)
+
+    qr_x = (canvas_width - qr_img.width) // 2
+    canvas.paste(qr_img, (qr_x, 0))
+
+    text_x = (canvas_width - text_width) // 2
+    text_y = qr_img.height + padding
+    draw_label(canvas, (text_x, text_y), text, fill=0)
+    return canvas
+
+
+def render_qr_svg(data, label="", box_size=10, border=5, error_correction=ERROR_CORRECT_M):
+    """Encode *data* and return SVG markup built straight from the module matrix.
+
+    Horizontal runs of dark modules are merged into one path segment each, and
+    the label is written as a ``<text>`` element below the code.
+    """
+    matrix = build_qr_matrix(data, border, error_correction)
+    modules = len(matrix)
+    segments = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < modules:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < modules and row[x]:
+                x += 1
+            segments.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+
+    size = modules * box_size
+    text = label.strip() if label else ""
+    label_height = SVG_LABEL_FONT_SIZE + (LABEL_PADDING * 2) if text else 0
+    height = size + label_height
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{height}" '
+        f'viewBox="0 0 {size} {height}" shape-rendering="crispEdges">',
+        f'<rect width="{size}" height="{height}" fill="#fff"/>',
+        f'<path transform="scale({box_size})" fill="#000" d="{"".join(segments)}"/>',
+    ]
+    if text:
+        max_width = size - (LABEL_PADDING * 2)
+        fit = ""
+        if len(text) * SVG_LABEL_FONT_SIZE * 0.6 > max_width:
+            fit = f' textLength="{max_width}" lengthAdjust="spacingAndGlyphs"'
+        parts.append(
+            f'<text x="{size // 2}" y="{size + LABEL_PADDING + SVG_LABEL_FONT_SIZE}" '
+            f'font-family="sans-serif" font-size="{SVG_LABEL_FONT_SIZE}" '
+            f'text-anchor="middle" fill="#000"{fit}>{escape(text)}</text>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+def save_svg(markup, path):
+    with open(path, "w", encoding="utf-8") as file_obj:
+        file_obj.write(markup)
+
+
+def save_png(image, path, png_mode="rgb", compress_level=6, optimize=False):
+    """Write a grayscale QR *image* as PNG in the requested colour mode.
+
+    ``rgb`` keeps the historical 24-bit output.  ``1bit`` and ``palette`` store
+    the same black/white pixels (label included, thresholded at mid-grey) as
+    a 1-bit grayscale or 2-colour palette PNG.
+    """
+    if png_mode == "1bit":
+        image = image.convert("1", dither=Image.Dither.NONE)
+    elif png_mode == "palette":
+        indexes = image.point(lambda value: 0 if value >= 128 else 1)
+        image = Image.frombytes("P", indexes.size, indexes.tobytes())
+        image.putpalette(BW_PALETTE)
+    else:
+        image = image.convert("RGB")
+    image.save(path, format="PNG", compress_level=int(compress_level), optimize=bool(optimize))
+
+
+def _render_plan(data, label, box_size, border, error_correction, output_format, png_mode, compress_level, optimize):
+    """Return ``(output_format, cache_key, render_to)`` for one set of render inputs."""
+    if output_format not in OUTPUT_FORMATS:
+        output_format = "png"
+    render_inputs = {
+        "data": data,
+        "label": label,
+        "box_size": box_size,
+        "border": border,
+        "error_correction": error_correction,
+    }
+
+    if output_format == "svg":
+        output_options = {"output_format": "svg"}
+
+        def render_to(target_path):
+            save_svg(render_qr_svg(**render_inputs), target_path)
+
+    else:
+        output_options = {
+            "png_mode": png_mode if png_mode in PNG_MODES else "rgb",
+            "compress_level": compress_level,
+            "optimize": optimize,
+        }
+
+        def render_to(target_path):
+            save_png(render_qr_image(**render_inputs), target_path, **output_options)
+
+    key = qr_cache.render_cache_key(**render_inputs, **output_options)
+    return output_format, key, render_to
+
+
+def _cached_render(key, output_format, render_to):
+    cached_path = qr_cache.lookup(key)
+    if cached_path is None:
+        cached_path = qr_cache.cache_path_for(key, ext=f".{output_format}")
+        qr_cache.write_atomic(cached_path, render_to)
+        qr_cache.store(key, cached_path)
+    return cached_path
+
+
+def render_qr_cached(
+    data: str,
+    label: str = "",
+    box_size: int = 10,
+    border: int = 5,
+    error_correction: int = ERROR_CORRECT_M,
+    output_format: str = "png",
+    png_mode: str = "rgb",
+    compress_level: int = 6,
+    optimize: bool = False,
+):
+    """Render into the bounded render cache only and return ``(key, cached_path)``.
+
+    Used for on-demand serving, where no copy under ``qr_codes`` is needed.
+    """
+    output_format, key, render_to = _render_plan(
+        data, label, box_size, border, error_correction, output_format, png_mode, compress_level, optimize
+    )
+    return key, _cached_render(key, output_format, render_to)
+
+
+def generate_qr(
+    data: str,
+    filename: str,
+    label: str = "",
+    box_size: int = 10,
+    border: int = 5,
+    error_correction: int = ERROR_CORRECT_M,
+    output_format: str = "png",
+    png_mode: str = "rgb",
+    compress_level: int = 6,
+    optimize: bool = False,
+    use_cache: bool = True,
+    fingerprint: bool = True,
+    previous_path: str = None,
+) -> str:
+    """Generate a QR code image from *data* and save it under *filename*.
+
+    The file is written to a ``qr_codes`` directory at the project root (created
+    if it doesn't exist).  The function returns the path to the saved PNG file,
+    or ``.svg`` file when *output_format* is ``"svg"``.
+
+    Renders are content-addressed: when the same inputs were rendered before,
+    the cached bytes are linked into place instead of rendering again.
+    *png_mode*, *compress_level* and *optimize* control the PNG encoding (see
+    :func:`save_png`).
+
+    With *fingerprint* the file name carries a hash of the render inputs
+    (``name.<hash>.png``), so the web app can serve it as immutable.
+    *previous_path*, the file this render replaces, is removed when the new
+    path differs from it.
+    """
+    if not os.path.exists("qr_codes"):
+        os.makedirs("qr_codes")
+
+    output_format, key, render_to = _render_plan(
+        data, label, box_size, border, error_correction, output_format, png_mode, compress_level, optimize
+    )
+    if fingerprint:
+        path = f"qr_codes/{filename}.{key[:FINGERPRINT_LENGTH]}.{output_format}"
+    else:
+        path = f"qr_codes/{filename}.{output_format}"
 
-    qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-
-    if label:
-        font = ImageFont.load_default()
-        text = label.strip()
-        draw = ImageDraw.Draw(qr_img)
-        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
-        text_width = right - left
-        text_height = bottom - top
-
-        padding = 14
-        extra_height = text_height + (padding * 2)
-        canvas_width = max(qr_img.width, text_width + (padding * 2))
-        canvas = Image.new("RGB", (canvas_width, qr_img.height + extra_height), "white")
-
-        qr_x = (canvas_width - qr_img.width) // 2
-        canvas.paste(qr_img, (qr_x, 0))
-
-        draw = ImageDraw.Draw(canvas)
-        text_x = (canvas_width - text_width) // 2
-        text_y = qr_img.height + padding
-        draw.text((text_x, text_y), text, fill="black", font=font)
-        canvas.save(path)
+    if not use_cache:
+        render_to(path)
     else:
-        qr_img.save(path)
+        qr_cache.materialize(_cached_render(key, output_format, render_to), path)
 
+    if previous_path and os.path.normpath(previous_path) != os.path.normpath(path):
+        try:
+            os.remove(previous_path)
+        except FileNotFoundError:
+            pass
     return path
@@ -0,0 +1,69 @@
+"""Cached label rendering for QR images.
+
+Labels are short ``"{name} | {roll}"`` strings drawn from a small character
+set, so the font is loaded once and every glyph is rasterized once.  A label is
+then measured from cached glyph metrics and blitted onto the target canvas
+without a temporary ``ImageDraw`` per call.
+"""
+
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+@lru_cache(maxsize=1)
+def label_font():
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1024)
+def glyph(char):
+    """Return ``(mask, left, top, advance)`` for *char* in the label font.
+
+    *mask* is an ``L`` image of the glyph's ink, *left*/*top* its offset from the
+    pen position, and *advance* the horizontal pen movement.
+    """
+    font = label_font()
+    left, top, right, bottom = font.getbbox(char)
+    if hasattr(font, "getlength"):
+        advance = font.getlength(char)
+    else:
+        advance = right
+    width, height = max(0, right - left), max(0, bottom - top)
+    if not width or not height:
+        return None, left, top, advance
+
+    mask = Image.new("L", (width, height), 0)
+    ImageDraw.Draw(mask).text((-left, -top), char, fill=255, font=font)
+    return mask, left, top, advance
+
+
+def label_bbox(text):
+    """Return the ``(left, top, right, bottom)`` ink box of *text* drawn at (0, 0)."""
+    pen = 0.0
+    left = top = right = bottom = None
+    for char in text:
+        mask, g_left, g_top, advance = glyph(char)
+        if mask is not None:
+            x0 = int(round(pen)) + g_left
+            x1 = x0 + mask.width
+            y1 = g_top + mask.height
+            left = x0 if left is None else min(left, x0)
+            top = g_top if top is None else min(top, g_top)
+            right = x1 if right is None else max(right, x1)
+            bottom = y1 if bottom is None else max(bottom, y1)
+        pen += advance
+    if left is None:
+        return 0, 0, 0, 0
+    return left, top, right, bottom
+
+
+def draw_label(canvas, origin, text, fill=0):
+    """Blit cached glyphs for *text* onto *canvas* with the pen starting at *origin*."""
+    x, y = origin
+    pen = 0.0
+    for char in text:
+        mask, g_left, g_top, advance = glyph(char)
+        if mask is not None:
+            canvas.paste(fill, (x + int(round(pen)) + g_left, y + g_top), mask)
+        pen += advance
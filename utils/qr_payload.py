@@ -0,0 +1,57 @@
+"""What goes into a project's QR: payload text and render options.
+
+Shared by the Streamlit app, which writes QR files, and the Flask app, which
+renders them on demand, so both produce identical images.
+"""
+
+from lan_address import detect_lan_ip
+
+
+def compute_qr_base_url(settings):
+    """Base URL for QR payloads: public URL, else manual URL when auto-detect
+    is off, else the detected LAN address with the Flask port."""
+    flask_port = int(settings.get("flask_port", 5000))
+    public_url = str(settings.get("public_base_url") or "").strip().rstrip("/")
+    manual_url = str(settings.get("manual_qr_base_url") or "").strip().rstrip("/")
+    if public_url:
+        return public_url
+    if not settings.get("auto_detect_ip", True) and manual_url:
+        return manual_url
+    return f"http://{detect_lan_ip()}:{flask_port}"
+
+
+def build_qr_payload(
+    qr_base_url,
+    project_id,
+    name,
+    roll,
+    project_title,
+    project_description,
+    video_link,
+    settings,
+):
+    url = f"{qr_base_url}/?id={project_id}"
+    mode = settings.get("qr_payload_mode", "url_only")
+    if mode != "url_with_text":
+        return url
+
+    lines = [
+        url,
+        f"Project: {project_title}",
+        f"Name: {name}",
+        f"Roll: {roll}",
+    ]
+    if project_description:
+        lines.append(f"Description: {project_description}")
+    if video_link:
+        lines.append(f"Video: {video_link}")
+    return "\n".join(lines)
+
+
+def qr_render_options(settings):
+    return {
+        "output_format": settings.get("qr_output_format", "png"),
+        "png_mode": settings.get("qr_png_mode", "palette"),
+        "compress_level": int(settings.get("qr_png_compress_level", 6)),
+        "optimize": bool(settings.get("qr_png_optimize", False)),
+    }
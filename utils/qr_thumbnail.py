@@ -0,0 +1,74 @@
+"""Downscaled QR previews for the View All Projects grid.
+
+A thumbnail is written once per rendered QR file.  Fingerprinted QR names
+change whenever the render changes, so their thumbnails never need checking;
+legacy names are re-thumbnailed when the QR file is newer.  When a render
+replaces a QR file, the thumbnails of the old file are removed with it.  SVG
+QRs, and PNGs already within the target size, are used as-is.
+
+QR modules are hard-edged, so sources are shrunk by a whole factor with
+nearest-neighbour sampling and stored as 2-colour palette PNGs; smoothing
+filters would add grey pixels and make the "thumbnail" larger than the QR.
+"""
+
+import os
+
+from PIL import Image
+
+from .qr_cache import write_atomic
+from .qr_generator import FINGERPRINT_PATTERN, save_png
+
+
+THUMBNAIL_DIR = "qr_thumbs"
+THUMBNAIL_SIZE = 320
+
+
+def qr_thumbnail(qr_path, size=THUMBNAIL_SIZE):
+    """Return the path of a thumbnail of *qr_path*, creating it if needed.
+
+    Returns *qr_path* itself when it is no larger than *size*, and ``None``
+    when it is empty or missing.
+    """
+    if not qr_path:
+        return None
+    if qr_path.lower().endswith(".svg"):
+        return qr_path if os.path.exists(qr_path) else None
+
+    name = os.path.basename(qr_path).rsplit(".", 1)[0]
+    thumb_path = os.path.join(THUMBNAIL_DIR, f"{name}.{size}.png")
+    fingerprinted = FINGERPRINT_PATTERN.search(qr_path) is not None
+    try:
+        thumb_mtime = os.stat(thumb_path).st_mtime_ns
+    except FileNotFoundError:
+        thumb_mtime = None
+    if thumb_mtime is not None and fingerprinted:
+        return thumb_path
+    try:
+        source_mtime = os.stat(qr_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if thumb_mtime is not None and thumb_mtime >= source_mtime:
+        return thumb_path
+
+    with Image.open(qr_path) as image:
+        width, height = image.size
+        factor = -(-max(width, height) // size)
+        if factor <= 1:
+            return qr_path
+        thumbnail = image.convert("L").resize((width // factor, height // factor), Image.NEAREST)
+
+    def write_thumbnail(target_path):
+        save_png(thumbnail, target_path, png_mode="palette", compress_level=9, optimize=True)
+
+    write_atomic(thumb_path, write_thumbnail)
+    return thumb_path
+
+
+def remove_qr_thumbnails(qr_path, sizes=(THUMBNAIL_SIZE,)):
+    """Delete the thumbnails of the QR file *qr_path* in the given *sizes*."""
+    name = os.path.basename(qr_path).rsplit(".", 1)[0]
+    for size in sizes:
+        try:
+            os.remove(os.path.join(THUMBNAIL_DIR, f"{name}.{size}.png"))
+        except FileNotFoundError:
+            pass
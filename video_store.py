@@ -0,0 +1,152 @@
+"""Disk storage for uploaded project videos.
+
+Uploads are copied in fixed-size chunks into a temp file next to their final
+location, hashed on the way, fsynced and renamed into place, so memory per
+upload is bounded by the chunk size and a crash never leaves a partial file
+under the final name.
+
+Files are content-addressed: a video is stored once as ``<sha256><ext>`` and
+shared by every project whose ``video_link`` points at it.  Files no project
+references any more are removed by :func:`sweep_orphan_videos`.
+"""
+
+import hashlib
+import os
+import re
+import time
+import uuid
+
+
+CHUNK_SIZE = 1024 * 1024
+CONTENT_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+# Files younger than this are never swept: their project row may not be
+# committed yet.
+ORPHAN_GRACE_SECONDS = 3600
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def _too_large(max_bytes):
+    return UploadTooLarge(f"Video is larger than the {max_bytes // (1024 * 1024)} MB upload limit.")
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_stream_atomic(source, final_path, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """Copy the binary stream *source* to *final_path* and return ``(sha256, size)``.
+
+    Raises :class:`UploadTooLarge` as soon as more than *max_bytes* were read.
+    """
+    directory = os.path.dirname(os.path.abspath(final_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.part")
+    # Not mkstemp: its 0600 mode would survive the rename, and a proxy
+    # serving the uploads as another user could not read them.
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as file_obj:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                file_obj.write(chunk)
+            file_obj.flush()
+            os.fsync(file_obj.fileno())
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+    return digest.hexdigest(), size
+
+
+def hash_stream(source, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """Return ``(sha256, size)`` of the binary stream *source* without storing it."""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise _too_large(max_bytes)
+        digest.update(chunk)
+    return digest.hexdigest(), size
+
+
+def is_content_name(file_name):
+    return bool(CONTENT_NAME_PATTERN.match(file_name))
+
+
+def store_video(source, directory, ext, max_bytes=None):
+    """Store the seekable stream *source* under its content hash in *directory*.
+
+    Returns ``(file_name, created)``.  When a file with the same content is
+    already stored nothing is written and *created* is ``False``.
+    """
+    source.seek(0)
+    sha256, size = hash_stream(source, max_bytes=max_bytes)
+    file_name = f"{sha256}{ext.lower()}"
+    final_path = os.path.join(directory, file_name)
+    try:
+        if os.path.getsize(final_path) == size:
+            os.utime(final_path)
+            return file_name, False
+    except OSError:
+        pass
+    source.seek(0)
+    written_sha256, _ = write_stream_atomic(source, final_path, max_bytes=max_bytes)
+    if written_sha256 != sha256:
+        os.remove(final_path)
+        raise ValueError("Uploaded video changed while it was being saved.")
+    return file_name, True
+
+
+def sweep_orphan_videos(directory, reference_counts, grace_seconds=ORPHAN_GRACE_SECONDS):
+    """Delete files in *directory* with no entry in *reference_counts*.
+
+    Leftover ``.part`` temp files are removed too.  Anything modified within
+    *grace_seconds* is kept.  Returns ``(removed_count, freed_bytes)``.
+    """
+    if not os.path.isdir(directory):
+        return 0, 0
+    cutoff = time.time() - grace_seconds
+    removed_count = 0
+    freed_bytes = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if reference_counts.get(entry.name, 0) > 0:
+                continue
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+                if stat_result.st_mtime > cutoff:
+                    continue
+                os.remove(entry.path)
+            except OSError:
+                continue
+            removed_count += 1
+            freed_bytes += stat_result.st_size
+    return removed_count, freed_bytes
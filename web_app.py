@@ -2,20 +2,43 @@
 Flask web app to display project details from QR code scan.
 """
 
-from flask import Flask, render_template, request, send_from_directory
-import sqlite3
+from flask import Flask, abort, make_response, render_template, request, send_file
+import hashlib
+import mimetypes
 import os
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime
-from database import init_db
-from settings_store import load_settings
+from datetime import datetime, timezone
+from werkzeug.security import safe_join
+from database import get_connection, init_db
+from page_cache import RenderedPageCache
+from settings_store import load_settings, settings_modified_at, settings_version
+from utils.file_response import ranged_file_response
+from utils.qr_generator import FINGERPRINT_PATTERN, render_qr_cached
+from utils.qr_payload import build_qr_payload, compute_qr_base_url, qr_render_options
 from utils.video_download import get_download_context
+from video_store import is_content_name
+
+# QR codes may be stored as SVG; make sure they are not served as text/plain.
+mimetypes.add_type("image/svg+xml", ".svg")
 
 app = Flask(__name__, static_folder='qr_codes', static_url_path='/qr_codes')
 
-DATABASE = "expo.db"
 UPLOADED_VIDEOS_DIR = os.path.join(app.root_path, "uploaded_videos")
 init_db()
+PAGE_CACHE = RenderedPageCache()
+QR_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _templates_fingerprint():
+    digest = hashlib.sha1()
+    for name in ("project_detail.html", "qr_expired.html"):
+        with open(os.path.join(app.root_path, "templates", name), "rb") as file_obj:
+            digest.update(file_obj.read())
+    return digest.hexdigest()[:12]
+
+
+# Part of every page ETag so a deploy with changed templates is not served 304.
+TEMPLATES_FINGERPRINT = _templates_fingerprint()
 
 
 # -----------------------------
@@ -23,7 +46,7 @@ init_db()
 # -----------------------------
 def get_project_by_id(project_id):
     try:
-        conn = sqlite3.connect(DATABASE)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -36,14 +59,14 @@ def get_project_by_id(project_id):
                 website_link,
                 video_link,
                 qr_path,
-                expires_at
+                expires_at,
+                updated_at
             FROM projects
             WHERE id = ?
             """,
             (project_id,),
         )
         data = cursor.fetchone()
-        conn.close()
         return data
     except Exception as e:
         print("Database Error:", e)
@@ -51,33 +74,113 @@ def get_project_by_id(project_id):
 
 
 # -----------------------------
-# Helper: Get All Projects
+# Helper: Get One Page Of Projects
 # -----------------------------
-def get_all_projects():
+LIST_DESCRIPTION_CHARS = 300
+MAX_PAGE_SIZE = 100
+
+
+def get_projects_page(after_id=None, before_id=None, search="", limit=24):
+    """Keyset-paginated project listing ordered by id.
+
+    Pass *after_id* for the page following a cursor, *before_id* for the page
+    preceding it.  *search* filters by roll or title prefix (case-insensitive).
+    Returns ``(rows, has_prev, has_next)``; descriptions are truncated.
+    """
+    backwards = before_id is not None
+    cursor_clause = ""
+    cursor_params = []
+    if backwards:
+        cursor_clause = "id < ?"
+        cursor_params = [before_id]
+    elif after_id is not None:
+        cursor_clause = "id > ?"
+        cursor_params = [after_id]
+
+    select = f"""
+        SELECT
+            id,
+            name,
+            roll,
+            project_title,
+            substr(project_description, 1, {LIST_DESCRIPTION_CHARS}),
+            website_link,
+            video_link,
+            expires_at
+        FROM projects
+    """
+    prefix = (search or "").strip().lower()
+    if prefix:
+        # One range scan per index (roll prefix on the identity index, title
+        # prefix on idx_projects_title_key); an OR in a single WHERE would
+        # make SQLite walk the primary key and filter every row instead.
+        upper = prefix + "\U0010ffff"
+        parts = []
+        params = []
+        for column in ("roll_key", "title_key"):
+            clauses = [f"{column} >= ? AND {column} < ?"]
+            params.extend([prefix, upper])
+            if cursor_clause:
+                # Unary + keeps the planner from preferring a rowid walk.
+                clauses.append(f"+{cursor_clause}")
+                params.extend(cursor_params)
+            parts.append(f"{select} WHERE {' AND '.join(clauses)}")
+        query = " UNION ".join(parts)
+    else:
+        query = select + (f" WHERE {cursor_clause}" if cursor_clause else "")
+        params = cursor_params
+
+    order = "DESC" if backwards else "ASC"
     try:
-        conn = sqlite3.connect(DATABASE)
+        conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT
-                id,
-                name,
-                roll,
-                project_title,
-                project_description,
-                website_link,
-                video_link,
-                qr_path,
-                expires_at
-            FROM projects
-            """
-        )
-        data = cursor.fetchall()
-        conn.close()
-        return data
+        cursor.execute(f"{query} ORDER BY id {order} LIMIT ?", (*params, limit + 1))
+        rows = cursor.fetchall()
     except Exception as e:
         print("Database Error:", e)
-        return []
+        return [], False, False
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+        return rows, has_more, True
+    return rows, after_id is not None, has_more
+
+
+def _parse_utc(text):
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def project_page_validators(project_data, version, origin, expired):
+    """Strong ETag and Last-Modified for a project page, computed without rendering."""
+    digest = hashlib.sha1(
+        repr((TEMPLATES_FINGERPRINT, version, origin, expired, tuple(project_data))).encode("utf-8")
+    )
+    candidates = [_parse_utc(project_data[9] if len(project_data) > 9 else None)]
+    settings_mtime = settings_modified_at()
+    if settings_mtime is not None:
+        candidates.append(datetime.fromtimestamp(int(settings_mtime), tz=timezone.utc))
+    if expired:
+        # The page switched to the expired notice at expires_at.
+        candidates.append(_parse_utc(project_data[8]))
+    candidates = [value for value in candidates if value is not None]
+    return digest.hexdigest(), max(candidates) if candidates else None
+
+
+def conditional_page(body, etag, last_modified):
+    """Wrap *body* with validators; browsers must revalidate but get 304s."""
+    response = make_response(body)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 def is_qr_expired(expires_at_text, settings):
@@ -152,9 +255,68 @@ def get_video_context(video_link, origin=None):
     }
 
 
+@app.after_request
+def cache_qr_images(response):
+    # Fingerprinted QR files (name.<hash>.png) never change: let phones keep them.
+    if request.path.startswith("/qr_codes/") and response.status_code in (200, 304):
+        if FINGERPRINT_PATTERN.search(request.path):
+            response.cache_control.public = True
+            response.cache_control.max_age = QR_IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        else:
+            response.cache_control.no_cache = True
+    return response
+
+
+@app.route("/qr/<int:project_id>.<ext>")
+def project_qr(project_id, ext):
+    """Render a project's QR from its row and the current settings on demand.
+
+    Renders land in the bounded render cache (``qr_cache/``) and are served
+    from there afterwards.  The URL is stable while its content follows the
+    settings, so clients revalidate against the render-key ETag.
+    """
+    if ext not in ("png", "svg"):
+        abort(404)
+    project_data = get_project_by_id(project_id)
+    if not project_data:
+        abort(404)
+
+    settings = load_settings()
+    name, roll, title, description = ((value or "").strip() for value in project_data[1:5])
+    video_link = (project_data[6] or "").strip()
+    payload = build_qr_payload(
+        compute_qr_base_url(settings), project_id, name, roll, title, description, video_link, settings
+    )
+    options = {**qr_render_options(settings), "output_format": ext}
+    key, cached_path = render_qr_cached(payload, label=f"{name} | {roll}", **options)
+    etag = key[:20]
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        try:
+            file_obj = open(cached_path, "rb")
+        except FileNotFoundError:
+            # Evicted by another process between render and open.
+            key, cached_path = render_qr_cached(payload, label=f"{name} | {roll}", **options)
+            file_obj = open(cached_path, "rb")
+        mimetype = "image/svg+xml" if ext == "svg" else "image/png"
+        response = send_file(file_obj, mimetype=mimetype, conditional=False)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
 @app.route("/uploaded_videos/<path:filename>")
 def uploaded_videos(filename):
-    return send_from_directory(UPLOADED_VIDEOS_DIR, filename, as_attachment=False)
+    path = safe_join(UPLOADED_VIDEOS_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    if is_content_name(os.path.basename(path)):
+        # Content-addressed names never change content.
+        return ranged_file_response(request, path, max_age=QR_IMMUTABLE_MAX_AGE, immutable=True)
+    return ranged_file_response(request, path)
 
 
 # -----------------------------
@@ -168,13 +330,27 @@ def index():
 
     # If QR scanned (with ?id=)
     if project_id:
+        cache_id = int(project_id) if project_id.isdigit() else None
+        version = settings_version()
+        change_id = None
+        if cache_id is not None:
+            cached, change_id = PAGE_CACHE.get(cache_id, version, origin)
+            if cached is not None:
+                return conditional_page(cached["body"], cached["etag"], cached["last_modified"])
 
         project_data = get_project_by_id(project_id)
 
         if project_data:
             expires_at = project_data[8]
-            if is_qr_expired(expires_at, settings):
-                return render_template("qr_expired.html", project_title=project_data[3], expires_at=expires_at)
+            expired = is_qr_expired(expires_at, settings)
+            etag, last_modified = project_page_validators(project_data, version, origin, expired)
+            if request.if_none_match.contains(etag):
+                # Nothing changed since the phone's copy: skip rendering entirely.
+                return conditional_page("", etag, last_modified)
+
+            if expired:
+                page = render_template("qr_expired.html", project_title=project_data[3], expires_at=expires_at)
+                return conditional_page(page, etag, last_modified)
 
             website = project_data[5]
             description = project_data[4]
@@ -185,7 +361,7 @@ def index():
             spacing_scale = float(settings.get("spacing_scale", 1.0))
             video_fit = settings.get("video_fit", "contain")
 
-            return render_template(
+            page = render_template(
                 "project_detail.html",
                 project_title=project_data[3],
                 live_video_link=(video_link or "").strip(),
@@ -199,11 +375,34 @@ def index():
                 ui_spacing_scale=spacing_scale,
                 ui_video_fit=video_fit,
             )
+            if cache_id is not None:
+                PAGE_CACHE.put(
+                    cache_id,
+                    version,
+                    origin,
+                    page,
+                    expires_at_text=expires_at,
+                    etag=etag,
+                    last_modified=last_modified,
+                    change_id=change_id,
+                )
+            return conditional_page(page, etag, last_modified)
         else:
             return render_template("project_not_found.html")
 
-    # If no ID → show all projects
-    projects_raw = get_all_projects()
+    # If no ID → show one page of projects
+    search = (request.args.get("q") or "").strip()
+    after_id = request.args.get("after", type=int)
+    before_id = request.args.get("before", type=int)
+    page_size = request.args.get("per_page", type=int) or int(settings.get("list_page_size", 24))
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    projects_raw, has_prev, has_next = get_projects_page(
+        after_id=after_id,
+        before_id=before_id,
+        search=search,
+        limit=page_size,
+    )
     projects = []
 
     for row in projects_raw:
@@ -215,10 +414,17 @@ def index():
             "website": row[5],
             "description": row[4],
             "video_link": row[6],
-            "expires_at": row[8],
+            "expires_at": row[7],
         })
 
-    return render_template("projects_list.html", projects=projects)
+    return render_template(
+        "projects_list.html",
+        projects=projects,
+        search=search,
+        per_page=page_size,
+        prev_cursor=projects[0]["id"] if projects and has_prev else None,
+        next_cursor=projects[-1]["id"] if projects and has_next else None,
+    )
 
 
 # -----------------------------